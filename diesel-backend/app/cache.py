@@ -0,0 +1,50 @@
+"""
+Response Cache
+
+/latest, /series and /regions summarize the whole prices/inventories tables,
+but that data only changes when a fetch stores something new. So we keep each
+summary in memory for a short while instead of re-running the SQL on every
+dashboard refresh - and the fetchers clear the affected entries after a store.
+
+The cache lives in this process: with several uvicorn workers, each has its own.
+"""
+
+import threading
+from typing import Any, Callable
+
+from cachetools import TTLCache
+
+
+# Cache keys, grouped by the table they summarize - a fetch that stores
+# prices clears PRICE_KEYS, one that stores inventories clears INVENTORY_KEYS
+PRICE_KEYS = ("latest_prices", "price_series")
+INVENTORY_KEYS = ("latest_inventories", "inventory_regions")
+
+# Entries expire after 60 seconds even if no fetch clears them
+_cache = TTLCache(maxsize=32, ttl=60)
+
+# One lock for all entries: while one request computes a missing entry,
+# others wait for it instead of all running the same query at once
+_lock = threading.Lock()
+
+
+def cached(key: str, compute: Callable[[], Any]) -> Any:
+    """
+    Return the cached value for `key`, computing and storing it if missing.
+    
+    Example:
+        return cached("latest_prices", _load_latest_prices)
+    """
+    with _lock:
+        if key in _cache:
+            return _cache[key]
+        value = compute()
+        _cache[key] = value
+        return value
+
+
+def invalidate(*keys: str):
+    """Drop the given entries so the next request recomputes them."""
+    with _lock:
+        for key in keys:
+            _cache.pop(key, None)
@@ -8,7 +8,8 @@ This file handles:
 """
 
 import os
-from sqlalchemy import create_engine, text
+from contextlib import nullcontext
+from sqlalchemy import create_engine, event, insert, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 
@@ -18,13 +19,46 @@ load_dotenv()
 # SQLite just needs a file path - no server required!
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/diesel_data.db")
 
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
 # Create the database engine
-# check_same_thread=False is needed for SQLite with FastAPI
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False},
-    echo=False,  # Set to True to see all SQL queries (helpful for learning!)
-)
+# Connections are kept open in a pool and reused between requests, so the
+# per-connection setup (and the SQLite PRAGMAs below) only runs once each.
+if IS_SQLITE:
+    # check_same_thread=False is needed for SQLite with FastAPI
+    # timeout: wait up to 30s for another connection's write lock instead of failing
+    engine = create_engine(
+        DATABASE_URL, 
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=10,
+        echo=False,  # Set to True to see all SQL queries (helpful for learning!)
+    )
+else:
+    # Server databases (e.g. Postgres): recycle connections hourly and check
+    # them before use, so a connection dropped by the server isn't handed out
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=3600,
+        pool_pre_ping=True,
+        echo=False,
+    )
+
+
+# SQLite tuning, applied to every new connection:
+# - WAL journal lets the API keep reading while a fetch is writing
+# - synchronous=NORMAL only fsyncs at checkpoints (safe with WAL)
+# - temp tables/sorts in memory, and reads through a 256 MB memory map
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
 
 # Create a session factory
 # Sessions are how we interact with the database
@@ -64,16 +98,84 @@ def init_db():
     os.makedirs("data", exist_ok=True)
     
     # Import models so SQLAlchemy knows about them
-    from app.models import Price, Inventory, FetchLog, DataQuality
+    from app.models import Price, Inventory, PriceLatest, InventoryLatest, RegionOrder, FetchLog, DataQuality
+    from app.fetchers import fred, eia
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
     
+    # create_all skips tables that already exist, so add any indexes that
+    # were introduced after the database was first created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    with engine.begin() as conn:
+        # The primary key already indexes 'id' - these older indexes were redundant
+        for table_name in ("prices", "inventories", "fetch_log", "data_quality"):
+            conn.execute(text(f"DROP INDEX IF EXISTS ix_{table_name}_id"))
+        
+        # Replaced by the covering (..., date DESC, value) indexes and the
+        # (date, series_id) index in models.py
+        for index_name in ("ix_price_series_date", "ix_inventory_region_product_date", "ix_price_date"):
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+        
+        # Rebuild the latest_prices / latest_inventories summaries from the
+        # full tables (the fetchers keep them current after this). They only
+        # hold data derived from prices/inventories, so they're recreated from
+        # scratch - that way they always have the columns models.py defines.
+        for summary in (PriceLatest, InventoryLatest):
+            summary.__table__.drop(conn, checkfirst=True)
+            summary.__table__.create(conn)
+        for (series_id,) in conn.execute(text("SELECT DISTINCT series_id FROM prices")).all():
+            fred.refresh_latest(conn, series_id)
+        for region, product in conn.execute(text("SELECT DISTINCT region, product FROM inventories")).all():
+            eia.refresh_latest(conn, region, product)
+        
+        # Region display order, straight from the EIA fetcher's region list
+        conn.execute(RegionOrder.__table__.delete())
+        conn.execute(
+            insert(RegionOrder),
+            [{"region": region, "position": position} for region, position in eia.REGION_ORDER.items()],
+        )
+        
+        # Refresh table statistics so SQLite's query planner picks the right index
+        conn.execute(text("ANALYZE"))
+    
     print(f"📁 Database location: {DATABASE_URL}")
-    print("📊 Tables created/verified: prices, inventories, fetch_log, data_quality")
+    print("📊 Tables created/verified: prices, inventories, latest_prices, latest_inventories, region_order, fetch_log, data_quality")
+
+
+def init_db_if_needed():
+    """
+    Run init_db(), but only if the database is missing something it creates.
+    
+    For scripts that only read: init_db() rebuilds the summary tables
+    (latest_prices, latest_inventories, region_order) from scratch, which
+    there's no need to do on every run - but a database created by an older
+    version of this code doesn't have them yet (or is missing some of their
+    columns), and the scripts' queries would fail without them.
+    """
+    from app import models  # so Base.metadata knows about every table
+    
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            init_db()
+            return
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        if not set(table.columns.keys()) <= columns:
+            init_db()
+            return
+
 
+def _use_connection(conn=None):
+    """Use the caller's open connection, or check one out of the pool for this query."""
+    return nullcontext(conn) if conn is not None else engine.connect()
 
-def run_query(sql: str, params: dict = None):
+
+def run_query(sql: str, params: dict = None, conn=None):
     """
     Run a raw SQL query and return results as a list of dictionaries.
     
@@ -84,17 +186,52 @@ def run_query(sql: str, params: dict = None):
         for row in results:
             print(row)
     
+    Scripts that run several queries can open one connection and pass it to
+    each call, instead of checking a connection out of the pool every time:
+    
+        with engine.connect() as conn:
+            prices = run_query("SELECT * FROM prices LIMIT 5", conn=conn)
+            inventories = run_query("SELECT * FROM inventories LIMIT 5", conn=conn)
+    
     Args:
         sql: The SQL query string
         params: Optional dictionary of parameters (for safe queries)
+        conn: Optional open connection to run the query on
     
     Returns:
         List of result rows as dictionaries
     """
-    with engine.connect() as conn:
-        result = conn.execute(text(sql), params or {})
-        # Convert Row objects to dictionaries for easier access
-        return [dict(row._mapping) for row in result.fetchall()]
+    with _use_connection(conn) as conn:
+        # .mappings() gives dict-like rows directly - no per-row dict() copy
+        return conn.execute(text(sql), params or {}).mappings().all()
+
+
+def run_query_iter(sql: str, params: dict = None, conn=None, tuples: bool = False):
+    """
+    Run a raw SQL query and yield result rows one at a time.
+    
+    Same as run_query, but rows are streamed from the database instead of
+    loaded into a list first - use it for big results like full-table exports.
+    
+        for row in run_query_iter("SELECT * FROM prices"):
+            print(row["series_id"], row["value"])
+    
+    Args:
+        sql: The SQL query string
+        params: Optional dictionary of parameters (for safe queries)
+        conn: Optional open connection to run the query on (finish reading
+              the rows before running another query on it)
+        tuples: Yield plain rows (values in SELECT order, like a tuple)
+                instead of dictionaries - e.g. to hand straight to csv.writer
+    
+    Yields:
+        Result rows as dictionaries (or tuple-like rows if tuples=True)
+    """
+    with _use_connection(conn) as conn:
+        # Streaming is set for this one query only - the caller's connection
+        # keeps its normal settings for whatever it runs next
+        result = conn.execute(text(sql), params or {}, execution_options={"stream_results": True})
+        yield from (result if tuples else result.mappings())
 
 
 # Command-line interface for database operations
@@ -0,0 +1,72 @@
+"""
+Shared HTTP Client for the Fetchers
+
+Each fetcher (fred.py, eia.py) keeps one SharedClient: an HTTP client that is
+reused across fetches, plus a semaphore that limits how many requests to
+that API are in flight at once (to stay under its rate limit).
+"""
+
+import asyncio
+import httpx
+from typing import Optional
+
+
+class SharedClient:
+    """
+    One API's shared HTTP client and request-limit semaphore.
+    
+    The client is reused across fetches so each request doesn't pay for a
+    fresh DNS lookup and TLS handshake. It's created on first use and closed
+    on shutdown, and uses HTTP/2 when the server supports it (falling back
+    to HTTP/1.1 otherwise).
+    
+    The client and the semaphore both belong to the event loop they were
+    created on, so they're created together - and again if a new loop asks
+    for them (e.g. a script that calls asyncio.run() twice).
+    
+    Usage:
+        api = SharedClient(max_requests=4)
+        
+        async with api.get_semaphore():
+            response = await api.get_client().get(url)
+    """
+    
+    def __init__(self, max_requests: int):
+        self.max_requests = max_requests
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client (created on first use)"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                http2=True,  # Concurrent requests share one multiplexed connection
+                limits=httpx.Limits(
+                    max_connections=10,
+                    max_keepalive_connections=10,
+                    keepalive_expiry=60,
+                ),
+                timeout=30.0,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_requests)
+            self._loop = loop
+        return self._client
+    
+    def get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the semaphore that limits requests in flight to max_requests.
+        
+        Wrap every request to the API in `async with get_semaphore():`.
+        """
+        self.get_client()  # makes sure both exist for the running event loop
+        return self._semaphore
+    
+    async def close(self):
+        """Close the shared HTTP client (called when the app shuts down)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+            self._loop = None
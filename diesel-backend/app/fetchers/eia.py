@@ -15,14 +15,20 @@ Data we fetch:
 - PADD 5 (West Coast) Distillate Stocks
 """
 
+import asyncio
+import logging
 import os
 import httpx
+import orjson
 from datetime import datetime, date, timedelta
 from typing import Optional, List, Dict
+from sqlalchemy import text, update
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.sqlite import insert
 
-from app.models import Inventory, FetchLog
+from app.cache import invalidate, INVENTORY_KEYS
+from app.models import FetchLog
+from app.fetchers._http import SharedClient
 
 
 # EIA API base URL (v2)
@@ -44,10 +50,149 @@ EIA_AREAS = {
     "R50": {"name": "PADD 5 - West Coast", "region": "PADD5"},
 }
 
+# Region code and display name for each area, looked up once here instead of on every store
+_REGION_BY_AREA = {code: info["region"] for code, info in EIA_AREAS.items()}
+_NAME_BY_AREA = {code: info["name"] for code, info in EIA_AREAS.items()}
+
+# Display order for regions (US first, then PADD1-PADD5), following EIA_AREAS
+REGION_ORDER = {info["region"]: i for i, info in enumerate(EIA_AREAS.values())}
+
+# Maximum EIA requests in flight at once, across every caller (bulk fetches,
+# single fetches) - keeps us under EIA's rate limit. The
+# semaphore that enforces it comes from get_semaphore().
+MAX_REQUESTS = 3
+
+# Progress messages go through the queued logger set up in app/logging_config.py
+logger = logging.getLogger("fetchers")
+
+# Bulk upserts go through a TEMP staging table: one executemany fills it
+# (TEMP tables live only on this connection and never touch the database file),
+# then a single INSERT ... SELECT merges everything into inventories.
+# "WHERE true" is required by SQLite so ON CONFLICT isn't parsed as a join clause.
+_STAGE_CREATE = text("""
+    CREATE TEMP TABLE IF NOT EXISTS _stage_inventories (
+        source TEXT, region TEXT, product TEXT, date TEXT, value REAL, unit TEXT
+    )
+""")
+# Staging rows are plain tuples in column order (dates already as ISO text),
+# handed straight to sqlite3's executemany without SQLAlchemy's parameter handling
+_STAGE_INSERT = "INSERT INTO _stage_inventories VALUES (?, ?, ?, ?, ?, ?)"
+_STAGE_MERGE = text("""
+    INSERT INTO inventories (source, region, product, date, value, unit)
+    SELECT source, region, product, date, value, unit FROM _stage_inventories WHERE true
+    ON CONFLICT (source, region, product, date) DO UPDATE SET
+        value = excluded.value,
+        fetched_at = CURRENT_TIMESTAMP
+""")
+_STAGE_CLEAR = text("DELETE FROM _stage_inventories")
+
+# Rebuilds one region's row in latest_inventories (see InventoryLatest in
+# models.py): the newest reading and the one before it, plus the region's
+# count, date range and min/max/average - all read off the
+# (region, product, date DESC, value) index
+_LATEST_REFRESH = text("""
+    INSERT INTO latest_inventories (
+        region, product, date, value, previous, unit, source,
+        records, first_date, min_value, max_value, avg_value
+    )
+    SELECT
+        newest.region,
+        newest.product,
+        newest.date,
+        newest.value,
+        (SELECT i.value FROM inventories i
+         WHERE i.region = newest.region AND i.product = newest.product
+           AND i.date < newest.date
+         ORDER BY i.date DESC LIMIT 1),
+        newest.unit,
+        newest.source,
+        stats.records,
+        stats.first_date,
+        stats.min_value,
+        stats.max_value,
+        stats.avg_value
+    FROM (
+        SELECT region, product, date, value, unit, source
+        FROM inventories
+        WHERE region = :region AND product = :product
+        ORDER BY date DESC
+        LIMIT 1
+    ) AS newest, (
+        SELECT
+            COUNT(*) AS records,
+            MIN(date) AS first_date,
+            MIN(value) AS min_value,
+            MAX(value) AS max_value,
+            AVG(value) AS avg_value
+        FROM inventories
+        WHERE region = :region AND product = :product
+    ) AS stats
+    WHERE true
+    ON CONFLICT (region, product) DO UPDATE SET
+        date = excluded.date,
+        value = excluded.value,
+        previous = excluded.previous,
+        unit = excluded.unit,
+        source = excluded.source,
+        records = excluded.records,
+        first_date = excluded.first_date,
+        min_value = excluded.min_value,
+        max_value = excluded.max_value,
+        avg_value = excluded.avg_value
+""")
+
+
+# API key, URL and the request parameters that never change - built once at
+# import (the .env file has already been loaded by app.database at this point)
+_API_KEY = os.getenv("EIA_API_KEY")
+_STOCKS_URL = f"{EIA_BASE_URL}/petroleum/sum/sndw/data/"
+_BASE_PARAMS = {
+    "api_key": _API_KEY,
+    "frequency": "weekly",
+    "data[0]": "value",
+    "facets[product][]": PRODUCT_DISTILLATE,
+    "facets[process][]": PROCESS_ENDING_STOCKS,
+    "sort[0][column]": "period",
+    "sort[0][direction]": "desc",
+    "length": 500,
+}
+
 
 def get_api_key() -> Optional[str]:
-    """Get EIA API key from environment variables"""
-    return os.getenv("EIA_API_KEY")
+    """Get EIA API key (read from environment variables at import)"""
+    return _API_KEY
+
+
+def _parse_date(value: str) -> date:
+    """Convert an API date string ('2024-12-20') to a date object"""
+    try:
+        # Fast path - API dates are plain ISO format
+        return date.fromisoformat(value)
+    except ValueError:
+        # More forgiving fallback (e.g. dates without zero padding)
+        return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+# Shared HTTP client and request-limit semaphore (see app/fetchers/_http.py)
+_http = SharedClient(MAX_REQUESTS)
+get_client = _http.get_client        # The shared EIA HTTP client
+get_semaphore = _http.get_semaphore  # Wrap every EIA request in `async with get_semaphore():`
+close_client = _http.close           # Called when the app shuts down
+
+
+def refresh_latest(db, region: str, product: str = "distillate"):
+    """
+    Update a region's row in the latest_inventories summary table.
+    
+    Called after every store (in the same transaction), and by init_db to
+    fill the table for databases created before it existed.
+    
+    Args:
+        db: Database session or connection
+        region: Region code (US, PADD1-PADD5)
+        product: Product name
+    """
+    db.execute(_LATEST_REFRESH, {"region": region, "product": product})
 
 
 async def fetch_distillate_stocks(
@@ -66,8 +211,7 @@ async def fetch_distillate_stocks(
     Returns:
         Dictionary with 'success', 'data', and 'error' keys
     """
-    api_key = get_api_key()
-    if not api_key:
+    if not _API_KEY:
         return {"success": False, "data": [], "error": "No EIA API key configured"}
     
     # Default date range: last 2 years
@@ -76,50 +220,40 @@ async def fetch_distillate_stocks(
     if not end_date:
         end_date = date.today()
     
-    # Build the API URL
-    url = f"{EIA_BASE_URL}/petroleum/sum/sndw/data/"
+    # Add the per-request parameters to the fixed ones
     params = {
-        "api_key": api_key,
-        "frequency": "weekly",
-        "data[0]": "value",
-        "facets[product][]": PRODUCT_DISTILLATE,
-        "facets[process][]": PROCESS_ENDING_STOCKS,
+        **_BASE_PARAMS,
         "facets[duoarea][]": area_code,
-        "start": start_date.strftime("%Y-%m-%d"),
-        "end": end_date.strftime("%Y-%m-%d"),
-        "sort[0][column]": "period",
-        "sort[0][direction]": "desc",
-        "length": 500,
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Parse observations
-            observations = []
-            response_data = data.get("response", {}).get("data", [])
-            
-            for obs in response_data:
-                value = obs.get("value")
-                if value is not None:
-                    # Convert string date to Python date object
-                    obs_date = datetime.strptime(obs["period"], "%Y-%m-%d").date()
-                    observations.append({
-                        "date": obs_date,
-                        "value": float(value),
-                        "unit": obs.get("units", "thousand barrels"),
-                    })
-            
-            return {
-                "success": True,
-                "data": observations,
-                "error": None,
-                "count": len(observations),
+        async with get_semaphore():
+            response = await get_client().get(_STOCKS_URL, params=params)
+        response.raise_for_status()
+        # orjson parses the raw bytes directly - much faster than response.json()
+        data = orjson.loads(response.content)
+        
+        # Parse observations (skipping weeks with no value)
+        response_data = data.get("response", {}).get("data", [])
+        observations = [
+            {
+                "date": _parse_date(obs["period"]),
+                "value": float(value),
+                "unit": obs.get("units", "thousand barrels"),
             }
-            
+            for obs in response_data
+            if (value := obs.get("value")) is not None
+        ]
+        
+        return {
+            "success": True,
+            "data": observations,
+            "error": None,
+            "count": len(observations),
+        }
+        
     except httpx.HTTPStatusError as e:
         return {"success": False, "data": [], "error": f"HTTP {e.response.status_code}: {str(e)}"}
     except Exception as e:
@@ -144,62 +278,116 @@ async def fetch_and_store_stocks(
     """
     start_date = date.today() - timedelta(days=months * 30)
     
-    # Get area info
-    area_info = EIA_AREAS.get(area_code, {"name": area_code, "region": area_code})
-    region = area_info["region"]
+    # Fetch the data
+    started_at = datetime.now()
+    result = await fetch_distillate_stocks(area_code, start_date=start_date)
+    
+    return store_stocks(db, area_code, result, start_date, started_at)
+
+
+def store_stocks(
+    db: Session,
+    area_code: str,
+    result: Dict,
+    start_date: date,
+    started_at: Optional[datetime] = None,
+) -> Dict:
+    """
+    Store an already-fetched EIA result and log it in 'fetch_log'.
+    
+    Kept separate from the network call so bulk fetches can download
+    every area concurrently and then write them one after another.
     
-    # Create fetch log entry
-    fetch_log = FetchLog(
+    Args:
+        db: Database session
+        area_code: EIA area code
+        result: The dictionary returned by fetch_distillate_stocks
+        start_date: Start of the fetched date range
+        started_at: When the fetch began (default: now)
+        
+    Returns:
+        Dictionary with fetch results
+    """
+    region = _REGION_BY_AREA.get(area_code, area_code)
+    
+    # Create fetch log entry with a Core insert (no ORM bookkeeping needed for
+    # an audit row). Everything below shares one transaction, so the log row,
+    # the upsert and the log update cost a single commit.
+    log_values = dict(
         source="EIA",
         endpoint="/petroleum/sum/sndw/data",
         series_id=f"distillate_{region}",
-        status="in_progress",
+        started_at=started_at or datetime.now(),
     )
-    db.add(fetch_log)
-    db.commit()
-    
-    # Fetch the data
-    result = await fetch_distillate_stocks(area_code, start_date=start_date)
+    log_id = db.execute(
+        insert(FetchLog).values(status="in_progress", **log_values)
+    ).inserted_primary_key[0]
     
     if not result["success"]:
-        fetch_log.status = "error"
-        fetch_log.error_message = result["error"]
-        fetch_log.completed_at = datetime.now()
+        # Update fetch log with error
+        db.execute(
+            update(FetchLog).where(FetchLog.id == log_id).values(
+                status="error",
+                error_message=result["error"],
+                completed_at=datetime.now(),
+            )
+        )
         db.commit()
-        return result
-    
-    # Store each observation
-    records_inserted = 0
-    for obs in result["data"]:
-        try:
-            stmt = insert(Inventory).values(
-                source="EIA",
-                region=region,
-                product="distillate",
-                date=obs["date"],
-                value=obs["value"],
-                unit="thousand_barrels",
-            ).on_conflict_do_update(
-                index_elements=['source', 'region', 'product', 'date'],
-                set_=dict(value=obs["value"], fetched_at=datetime.now())
+        # Say which region failed, like the success result does
+        return {**result, "region": region, "area_name": _NAME_BY_AREA.get(area_code, area_code)}
+    
+    try:
+        # Stage the observations, then upsert them all with one INSERT ... SELECT
+        rows = [
+            ("EIA", region, "distillate", obs["date"].isoformat(), obs["value"], "thousand_barrels")
+            for obs in result["data"]
+        ]
+        db.execute(_STAGE_CREATE)
+        if rows:
+            db.connection().exec_driver_sql(_STAGE_INSERT, rows)
+            db.execute(_STAGE_MERGE)
+            db.execute(_STAGE_CLEAR)
+            refresh_latest(db, region)
+    except Exception as e:
+        # Roll back the partial upsert, then record the failure on its own
+        db.rollback()
+        logger.error("Error inserting %s: %s", region, e)
+        db.execute(
+            insert(FetchLog).values(
+                status="error",
+                error_message=str(e),
+                completed_at=datetime.now(),
+                **log_values,
             )
-            db.execute(stmt)
-            records_inserted += 1
-        except Exception as e:
-            print(f"Error inserting {region} {obs['date']}: {e}")
+        )
+        db.commit()
+        return {
+            "success": False,
+            "region": region,
+            "area_name": _NAME_BY_AREA.get(area_code, area_code),
+            "data": [],
+            "error": str(e),
+        }
     
-    db.commit()
+    records_inserted = len(rows)
     
     # Update fetch log
-    fetch_log.status = "success"
-    fetch_log.records_fetched = records_inserted
-    fetch_log.completed_at = datetime.now()
+    db.execute(
+        update(FetchLog).where(FetchLog.id == log_id).values(
+            status="success",
+            records_fetched=records_inserted,
+            completed_at=datetime.now(),
+        )
+    )
     db.commit()
     
+    # New inventories are in - drop the cached summaries built from the old ones
+    invalidate(*INVENTORY_KEYS)
+    
     return {
         "success": True,
         "region": region,
-        "area_name": area_info["name"],
+        "area_name": _NAME_BY_AREA.get(area_code, area_code),
         "records_fetched": records_inserted,
         "date_range": f"{start_date} to {date.today()}",
     }
@@ -209,6 +397,9 @@ async def fetch_all_stocks(db: Session, months: int = 24) -> List[Dict]:
     """
     Fetch distillate stocks for all regions and store them.
     
+    The HTTP requests run concurrently; the database writes then
+    happen one region at a time on the same session.
+    
     Args:
         db: Database session
         months: How many months of history
@@ -216,17 +407,28 @@ async def fetch_all_stocks(db: Session, months: int = 24) -> List[Dict]:
     Returns:
         List of results for each region
     """
+    start_date = date.today() - timedelta(days=months * 30)
+    started_at = datetime.now()
+    
+    logger.info("📦 Fetching %s...", ", ".join(info["name"] for info in EIA_AREAS.values()))
+    fetched = await asyncio.gather(
+        *(fetch_distillate_stocks(code, start_date=start_date) for code in EIA_AREAS),
+        return_exceptions=True,
+    )
+    
     results = []
     
-    for area_code in EIA_AREAS.keys():
-        area_info = EIA_AREAS[area_code]
-        print(f"📦 Fetching {area_info['name']}...")
-        result = await fetch_and_store_stocks(db, area_code, months=months)
+    for area_code, fetch_result in zip(EIA_AREAS, fetched):
+        if isinstance(fetch_result, BaseException):
+            # One failed request shouldn't sink the others - record it like any other fetch error
+            fetch_result = {"success": False, "data": [], "error": str(fetch_result)}
+        logger.info("📦 Storing %s...", _NAME_BY_AREA[area_code])
+        result = store_stocks(db, area_code, fetch_result, start_date, started_at)
         results.append(result)
         
         if result["success"]:
-            print(f"   ✅ {result['records_fetched']} records")
+            logger.info("   ✅ %s records", result["records_fetched"])
         else:
-            print(f"   ❌ Error: {result.get('error')}")
+            logger.error("   ❌ Error: %s", result.get("error"))
     
     return results
@@ -11,14 +11,20 @@ FRED Series we use:
 - DDFUELNYH: No. 2 Diesel NY Harbor ($/gal)
 """
 
+import asyncio
+import logging
 import os
 import httpx
+import orjson
 from datetime import datetime, date, timedelta
 from typing import Optional, List, Dict
+from sqlalchemy import text, update
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.sqlite import insert
 
-from app.models import Price, FetchLog
+from app.cache import invalidate, PRICE_KEYS
+from app.models import FetchLog
+from app.fetchers._http import SharedClient
 
 
 # FRED API base URL
@@ -32,10 +38,137 @@ FRED_SERIES = {
     "DDFUELNYH": {"name": "ULSD NY Harbor", "unit": "$/gal"},
 }
 
+# Unit for each series, looked up once here instead of on every store
+_UNIT_BY_SID = {sid: info["unit"] for sid, info in FRED_SERIES.items()}
+
+# Maximum FRED requests in flight at once, across every caller (bulk fetches,
+# single fetches and the /fetch proxy) - keeps us under FRED's rate limit. The
+# semaphore that enforces it comes from get_semaphore().
+MAX_REQUESTS = 4
+
+# Progress messages go through the queued logger set up in app/logging_config.py
+logger = logging.getLogger("fetchers")
+
+# Bulk upserts go through a TEMP staging table: one executemany fills it
+# (TEMP tables live only on this connection and never touch the database file),
+# then a single INSERT ... SELECT merges everything into prices.
+# "WHERE true" is required by SQLite so ON CONFLICT isn't parsed as a join clause.
+_STAGE_CREATE = text("""
+    CREATE TEMP TABLE IF NOT EXISTS _stage_prices (
+        source TEXT, series_id TEXT, date TEXT, value REAL, unit TEXT
+    )
+""")
+# Staging rows are plain tuples in column order (dates already as ISO text),
+# handed straight to sqlite3's executemany without SQLAlchemy's parameter handling
+_STAGE_INSERT = "INSERT INTO _stage_prices VALUES (?, ?, ?, ?, ?)"
+_STAGE_MERGE = text("""
+    INSERT INTO prices (source, series_id, date, value, unit)
+    SELECT source, series_id, date, value, unit FROM _stage_prices WHERE true
+    ON CONFLICT (source, series_id, date) DO UPDATE SET
+        value = excluded.value,
+        fetched_at = CURRENT_TIMESTAMP
+""")
+_STAGE_CLEAR = text("DELETE FROM _stage_prices")
+
+# Rebuilds one series' row in latest_prices (see PriceLatest in models.py):
+# the newest price and the one before it, plus the series' count, date range
+# and min/max/average - all read off the (series_id, date DESC, value) index,
+# without touching the table itself
+_LATEST_REFRESH = text("""
+    INSERT INTO latest_prices (
+        series_id, date, value, previous, unit, source,
+        records, first_date, min_value, max_value, avg_value
+    )
+    SELECT
+        newest.series_id,
+        newest.date,
+        newest.value,
+        (SELECT p.value FROM prices p
+         WHERE p.series_id = newest.series_id AND p.date < newest.date
+         ORDER BY p.date DESC LIMIT 1),
+        newest.unit,
+        newest.source,
+        stats.records,
+        stats.first_date,
+        stats.min_value,
+        stats.max_value,
+        stats.avg_value
+    FROM (
+        SELECT series_id, date, value, unit, source
+        FROM prices
+        WHERE series_id = :series_id
+        ORDER BY date DESC
+        LIMIT 1
+    ) AS newest, (
+        SELECT
+            COUNT(*) AS records,
+            MIN(date) AS first_date,
+            MIN(value) AS min_value,
+            MAX(value) AS max_value,
+            AVG(value) AS avg_value
+        FROM prices
+        WHERE series_id = :series_id
+    ) AS stats
+    WHERE true
+    ON CONFLICT (series_id) DO UPDATE SET
+        date = excluded.date,
+        value = excluded.value,
+        previous = excluded.previous,
+        unit = excluded.unit,
+        source = excluded.source,
+        records = excluded.records,
+        first_date = excluded.first_date,
+        min_value = excluded.min_value,
+        max_value = excluded.max_value,
+        avg_value = excluded.avg_value
+""")
+
+
+# API key, URL and the request parameters that never change - built once at
+# import (the .env file has already been loaded by app.database at this point)
+_API_KEY = os.getenv("FRED_API_KEY")
+_OBSERVATIONS_URL = f"{FRED_BASE_URL}/series/observations"
+_BASE_PARAMS = {
+    "api_key": _API_KEY,
+    "file_type": "json",
+    "sort_order": "desc",  # Most recent first
+}
+
 
 def get_api_key() -> Optional[str]:
-    """Get FRED API key from environment variables"""
-    return os.getenv("FRED_API_KEY")
+    """Get FRED API key (read from environment variables at import)"""
+    return _API_KEY
+
+
+def _parse_date(value: str) -> date:
+    """Convert an API date string ('2024-12-20') to a date object"""
+    try:
+        # Fast path - API dates are plain ISO format
+        return date.fromisoformat(value)
+    except ValueError:
+        # More forgiving fallback (e.g. dates without zero padding)
+        return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+# Shared HTTP client and request-limit semaphore (see app/fetchers/_http.py)
+_http = SharedClient(MAX_REQUESTS)
+get_client = _http.get_client        # The shared FRED HTTP client
+get_semaphore = _http.get_semaphore  # Wrap every FRED request in `async with get_semaphore():`
+close_client = _http.close           # Called when the app shuts down
+
+
+def refresh_latest(db, series_id: str):
+    """
+    Update a series' row in the latest_prices summary table.
+    
+    Called after every store (in the same transaction), and by init_db to
+    fill the table for databases created before it existed.
+    
+    Args:
+        db: Database session or connection
+        series_id: The FRED series ID
+    """
+    db.execute(_LATEST_REFRESH, {"series_id": series_id})
 
 
 async def fetch_series(
@@ -56,8 +189,7 @@ async def fetch_series(
     Returns:
         Dictionary with 'success', 'data', and 'error' keys
     """
-    api_key = get_api_key()
-    if not api_key:
+    if not _API_KEY:
         return {"success": False, "data": [], "error": "No FRED API key configured"}
     
     # Default date range: last 2 years
@@ -66,44 +198,36 @@ async def fetch_series(
     if not end_date:
         end_date = date.today()
     
-    # Build the API URL
-    url = f"{FRED_BASE_URL}/series/observations"
+    # Add the per-request parameters to the fixed ones
     params = {
+        **_BASE_PARAMS,
         "series_id": series_id,
-        "api_key": api_key,
-        "file_type": "json",
         "observation_start": start_date.isoformat(),
         "observation_end": end_date.isoformat(),
-        "sort_order": "desc",  # Most recent first
         "limit": limit,
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Parse observations
-            observations = []
-            for obs in data.get("observations", []):
-                # FRED uses "." for missing values
-                value = obs.get("value")
-                if value and value != ".":
-                    # Convert string date to Python date object
-                    obs_date = datetime.strptime(obs["date"], "%Y-%m-%d").date()
-                    observations.append({
-                        "date": obs_date,
-                        "value": float(value),
-                    })
-            
-            return {
-                "success": True,
-                "data": observations,
-                "error": None,
-                "count": len(observations),
-            }
-            
+        async with get_semaphore():
+            response = await get_client().get(_OBSERVATIONS_URL, params=params)
+        response.raise_for_status()
+        # orjson parses the raw bytes directly - much faster than response.json()
+        data = orjson.loads(response.content)
+        
+        # Parse observations (FRED uses "." for missing values)
+        observations = [
+            {"date": _parse_date(obs["date"]), "value": float(value)}
+            for obs in data.get("observations", [])
+            if (value := obs.get("value")) and value != "."
+        ]
+        
+        return {
+            "success": True,
+            "data": observations,
+            "error": None,
+            "count": len(observations),
+        }
+        
     except httpx.HTTPStatusError as e:
         return {"success": False, "data": [], "error": f"HTTP {e.response.status_code}: {str(e)}"}
     except Exception as e:
@@ -138,60 +262,106 @@ async def fetch_and_store_series(
     if not start_date:
         start_date = date.today() - timedelta(days=months * 30)
     
-    # Create fetch log entry
-    fetch_log = FetchLog(
+    # Fetch the data
+    started_at = datetime.now()
+    result = await fetch_series(series_id, start_date=start_date)
+    
+    return store_series(db, series_id, result, start_date, started_at)
+
+
+def store_series(
+    db: Session,
+    series_id: str,
+    result: Dict,
+    start_date: date,
+    started_at: Optional[datetime] = None,
+) -> Dict:
+    """
+    Store an already-fetched FRED result and log it in 'fetch_log'.
+    
+    Kept separate from the network call so bulk fetches can download
+    every series concurrently and then write them one after another.
+    
+    Args:
+        db: Database session
+        series_id: The FRED series ID
+        result: The dictionary returned by fetch_series
+        start_date: Start of the fetched date range
+        started_at: When the fetch began (default: now)
+        
+    Returns:
+        Dictionary with fetch results
+    """
+    # Create fetch log entry with a Core insert (no ORM bookkeeping needed for
+    # an audit row). Everything below shares one transaction, so the log row,
+    # the upsert and the log update cost a single commit.
+    log_values = dict(
         source="FRED",
         endpoint="/series/observations",
         series_id=series_id,
-        status="in_progress",
+        started_at=started_at or datetime.now(),
     )
-    db.add(fetch_log)
-    db.commit()
-    
-    # Fetch the data
-    result = await fetch_series(series_id, start_date=start_date)
+    log_id = db.execute(
+        insert(FetchLog).values(status="in_progress", **log_values)
+    ).inserted_primary_key[0]
     
     if not result["success"]:
         # Update fetch log with error
-        fetch_log.status = "error"
-        fetch_log.error_message = result["error"]
-        fetch_log.completed_at = datetime.now()
+        db.execute(
+            update(FetchLog).where(FetchLog.id == log_id).values(
+                status="error",
+                error_message=result["error"],
+                completed_at=datetime.now(),
+            )
+        )
         db.commit()
-        return result
-    
-    # Get series info for unit
-    series_info = FRED_SERIES.get(series_id, {})
-    unit = series_info.get("unit", "unknown")
-    
-    # Store each observation in the database
-    records_inserted = 0
-    for obs in result["data"]:
-        try:
-            # Use INSERT OR REPLACE to handle duplicates
-            # This is SQLite-specific syntax
-            stmt = insert(Price).values(
-                source="FRED",
-                series_id=series_id,
-                date=obs["date"],
-                value=obs["value"],
-                unit=unit,
-            ).on_conflict_do_update(
-                index_elements=['source', 'series_id', 'date'],
-                set_=dict(value=obs["value"], fetched_at=datetime.now())
+        # Say which series failed, like the success result does
+        return {**result, "series_id": series_id}
+    
+    unit = _UNIT_BY_SID.get(series_id, "unknown")
+    
+    try:
+        # Stage the observations, then upsert them all with one INSERT ... SELECT
+        rows = [
+            ("FRED", series_id, obs["date"].isoformat(), obs["value"], unit)
+            for obs in result["data"]
+        ]
+        db.execute(_STAGE_CREATE)
+        if rows:
+            db.connection().exec_driver_sql(_STAGE_INSERT, rows)
+            db.execute(_STAGE_MERGE)
+            db.execute(_STAGE_CLEAR)
+            refresh_latest(db, series_id)
+    except Exception as e:
+        # Roll back the partial upsert, then record the failure on its own
+        db.rollback()
+        logger.error("Error inserting %s: %s", series_id, e)
+        db.execute(
+            insert(FetchLog).values(
+                status="error",
+                error_message=str(e),
+                completed_at=datetime.now(),
+                **log_values,
             )
-            db.execute(stmt)
-            records_inserted += 1
-        except Exception as e:
-            print(f"Error inserting {series_id} {obs['date']}: {e}")
+        )
+        db.commit()
+        return {"success": False, "series_id": series_id, "data": [], "error": str(e)}
     
-    db.commit()
+    records_inserted = len(rows)
     
     # Update fetch log
-    fetch_log.status = "success"
-    fetch_log.records_fetched = records_inserted
-    fetch_log.completed_at = datetime.now()
+    db.execute(
+        update(FetchLog).where(FetchLog.id == log_id).values(
+            status="success",
+            records_fetched=records_inserted,
+            completed_at=datetime.now(),
+        )
+    )
     db.commit()
     
+    # New prices are in - drop the cached summaries built from the old ones
+    invalidate(*PRICE_KEYS)
+    
     return {
         "success": True,
         "series_id": series_id,
@@ -205,6 +375,8 @@ async def fetch_all_series(db: Session, months: int = 24) -> List[Dict]:
     Fetch all configured FRED series and store them.
     
     This is what you'd call to update all price data at once.
+    The HTTP requests run concurrently; the database writes then
+    happen one series at a time on the same session.
     
     Args:
         db: Database session
@@ -213,16 +385,28 @@ async def fetch_all_series(db: Session, months: int = 24) -> List[Dict]:
     Returns:
         List of results for each series
     """
+    start_date = date.today() - timedelta(days=months * 30)
+    started_at = datetime.now()
+    
+    logger.info("📊 Fetching %s...", ", ".join(FRED_SERIES))
+    fetched = await asyncio.gather(
+        *(fetch_series(sid, start_date=start_date) for sid in FRED_SERIES),
+        return_exceptions=True,
+    )
+    
     results = []
     
-    for series_id in FRED_SERIES.keys():
-        print(f"📊 Fetching {series_id}...")
-        result = await fetch_and_store_series(db, series_id, months=months)
+    for series_id, fetch_result in zip(FRED_SERIES, fetched):
+        if isinstance(fetch_result, BaseException):
+            # One failed request shouldn't sink the others - record it like any other fetch error
+            fetch_result = {"success": False, "data": [], "error": str(fetch_result)}
+        logger.info("📊 Storing %s...", series_id)
+        result = store_series(db, series_id, fetch_result, start_date, started_at)
         results.append(result)
         
         if result["success"]:
-            print(f"   ✅ {result['records_fetched']} records")
+            logger.info("   ✅ %s records", result["records_fetched"])
         else:
-            print(f"   ❌ Error: {result.get('error')}")
+            logger.error("   ❌ Error: %s", result.get("error"))
     
     return results
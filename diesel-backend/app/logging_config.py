@@ -0,0 +1,34 @@
+"""
+Logging Setup
+
+The fetchers report their progress through the "fetchers" logger instead of print().
+Log lines are dropped onto a queue, and a background thread writes them to stdout -
+so a slow terminal never blocks the async fetch code while it waits on FRED/EIA.
+"""
+
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+
+def start_logging() -> QueueListener:
+    """
+    Send the "fetchers" logger through a queue and start the writer thread.
+    
+    Call this once at startup. Call .stop() on the returned listener at
+    shutdown - it writes out anything still waiting in the queue.
+    """
+    log_queue = queue.SimpleQueue()
+    
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter("%(message)s"))  # Same look as the old prints
+    
+    logger = logging.getLogger("fetchers")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [QueueHandler(log_queue)]  # Replace, so restarts don't double up
+    logger.propagate = False
+    
+    listener = QueueListener(log_queue, output)
+    listener.start()
+    return listener
@@ -7,11 +7,37 @@ Think of each class as a spreadsheet template - it defines what columns exist.
 SQLAlchemy (the library we're using) converts these Python classes into SQL tables.
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Text, UniqueConstraint
+from datetime import date
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Text, UniqueConstraint, Index, text
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.sql import func
 from app.database import Base
 
 
+class ISODate(TypeDecorator):
+    """
+    A Date column that SQLite stores as ISO text ('2024-12-20').
+    
+    The on-disk format is exactly what SQLAlchemy's Date already writes, so
+    raw SQL like WHERE date >= '2024-01-01', the CSV exports and existing
+    databases all keep working. The only difference is on the way in:
+    date.isoformat() is one C call, while the default SQLite adapter builds
+    a dict and %-formats it for every row we upsert. ISO strings are passed
+    through as-is, so filters can use either a date or '2024-01-01'.
+    """
+    impl = Date
+    cache_ok = True
+    
+    def bind_processor(self, dialect):
+        if dialect.name != "sqlite":
+            return super().bind_processor(dialect)
+        
+        def process(value):
+            return value.isoformat() if isinstance(value, date) else value
+        return process
+
+
 class Price(Base):
     """
     Stores price data (Brent, WTI, ULSD, etc.)
@@ -25,17 +51,23 @@ class Price(Base):
     __tablename__ = "prices"  # This is the SQL table name
     
     # Columns
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     source = Column(String(20), nullable=False)          # 'FRED', 'EIA', 'ICE'
     series_id = Column(String(50), nullable=False)       # 'DCOILBRENTEU', 'DDFUELUSGULF'
-    date = Column(Date, nullable=False)                  # The date of the price
+    date = Column(ISODate, nullable=False)               # The date of the price
     value = Column(Float, nullable=True)                 # The price (nullable for missing data)
     unit = Column(String(20), nullable=True)             # '$/bbl', '$/gal', '$/mt'
     fetched_at = Column(DateTime, server_default=func.now())  # When we fetched this
     
     # This ensures we don't have duplicate entries for the same series/date
+    # The indexes match how prices are read: one series newest-first (with the
+    # value included, so those reads never touch the table itself), or
+    # everything by date - on/after a date, or in (date, series) order for
+    # the CSV export, which then needs no sort
     __table_args__ = (
         UniqueConstraint('source', 'series_id', 'date', name='uix_price_series_date'),
+        Index('ix_prices_series_date', 'series_id', text('date DESC'), 'value'),
+        Index('ix_prices_date_series', 'date', 'series_id'),
     )
     
     def __repr__(self):
@@ -54,23 +86,110 @@ class Inventory(Base):
     """
     __tablename__ = "inventories"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     source = Column(String(20), nullable=False)          # 'EIA', 'INSIGHTS_GLOBAL'
     region = Column(String(20), nullable=False)          # 'US', 'PADD1', 'PADD3', 'ARA'
     product = Column(String(30), nullable=False)         # 'distillate', 'crude', 'gasoline'
-    date = Column(Date, nullable=False)
+    date = Column(ISODate, nullable=False)
     value = Column(Float, nullable=True)                 # Stock level
     unit = Column(String(30), nullable=True)             # 'thousand_barrels', 'million_mt'
     fetched_at = Column(DateTime, server_default=func.now())
     
+    # The index matches how the API reads inventories: one region newest-first,
+    # with the value included so those reads are answered from the index alone
     __table_args__ = (
         UniqueConstraint('source', 'region', 'product', 'date', name='uix_inventory'),
+        Index('ix_inv_region_product_date', 'region', 'product', text('date DESC'), 'value'),
     )
     
     def __repr__(self):
         return f"<Inventory {self.region} {self.product} {self.date}: {self.value}>"
 
 
+class PriceLatest(Base):
+    """
+    The newest price for each series, plus the one before it and a summary
+    of the whole series (record count, date range, min/max/average).
+    
+    A small summary table (one row per series) that the FRED fetcher refreshes
+    after every store, so /prices/latest, /prices/series and the scripts read
+    a handful of rows instead of going over the whole prices table each time.
+    
+    Example row:
+        series_id='DCOILBRENTEU', date='2024-12-20', value=72.50,
+        previous=71.90, unit='$/bbl', source='FRED', records=500,
+        first_date='2023-01-03', min_value=69.20, max_value=96.55, avg_value=81.37
+    """
+    __tablename__ = "latest_prices"
+    
+    series_id = Column(String(50), primary_key=True)
+    date = Column(ISODate, nullable=False)               # Date of the newest price
+    value = Column(Float, nullable=True)                 # The newest price
+    previous = Column(Float, nullable=True)              # The price before it
+    unit = Column(String(20), nullable=True)
+    source = Column(String(20), nullable=False)
+    records = Column(Integer, nullable=False)            # Prices stored for this series
+    first_date = Column(ISODate, nullable=False)         # Date of the oldest price
+    min_value = Column(Float, nullable=True)
+    max_value = Column(Float, nullable=True)
+    avg_value = Column(Float, nullable=True)
+    
+    def __repr__(self):
+        return f"<PriceLatest {self.series_id} {self.date}: {self.value}>"
+
+
+class InventoryLatest(Base):
+    """
+    The newest inventory reading for each region/product, plus the one before
+    it and a summary of all its readings (count, date range, min/max/average).
+    
+    Refreshed by the EIA fetcher after every store - /inventories/latest,
+    /inventories/regions and the scripts read it directly.
+    
+    Example row:
+        region='PADD3', product='distillate', date='2024-12-20', value=45200,
+        previous=44800, unit='thousand_barrels', source='EIA', records=104,
+        first_date='2023-01-06', min_value=38900, max_value=49800, avg_value=44120
+    """
+    __tablename__ = "latest_inventories"
+    
+    region = Column(String(20), primary_key=True)
+    product = Column(String(30), primary_key=True)
+    date = Column(ISODate, nullable=False)
+    value = Column(Float, nullable=True)
+    previous = Column(Float, nullable=True)
+    unit = Column(String(30), nullable=True)
+    source = Column(String(20), nullable=False)
+    records = Column(Integer, nullable=False)
+    first_date = Column(ISODate, nullable=False)
+    min_value = Column(Float, nullable=True)
+    max_value = Column(Float, nullable=True)
+    avg_value = Column(Float, nullable=True)
+    
+    def __repr__(self):
+        return f"<InventoryLatest {self.region} {self.product} {self.date}: {self.value}>"
+
+
+class RegionOrder(Base):
+    """
+    The order regions are listed in: US first, then PADD1-PADD5.
+    
+    Filled in by init_db() from the EIA fetcher's region list, so SQL can
+    sort by it (JOIN region_order USING (region) ... ORDER BY position)
+    instead of every query spelling out its own CASE region WHEN ... list.
+    
+    Example row:
+        region='PADD3', position=3
+    """
+    __tablename__ = "region_order"
+    
+    region = Column(String(20), primary_key=True)
+    position = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<RegionOrder {self.region}: {self.position}>"
+
+
 class FetchLog(Base):
     """
     Audit trail of data fetches.
@@ -88,13 +207,13 @@ class FetchLog(Base):
     """
     __tablename__ = "fetch_log"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     source = Column(String(20), nullable=False)          # 'FRED', 'EIA'
     endpoint = Column(String(100), nullable=True)        # The API endpoint called
     series_id = Column(String(50), nullable=True)        # Which series (if applicable)
     started_at = Column(DateTime, server_default=func.now())
     completed_at = Column(DateTime, nullable=True)
-    status = Column(String(20), nullable=False)          # 'success', 'error', 'partial'
+    status = Column(String(20), nullable=False)          # 'success', 'error', 'partial' (jobs: 'queued', 'running', 'completed')
     records_fetched = Column(Integer, default=0)
     error_message = Column(Text, nullable=True)          # Error details if failed
     
@@ -121,7 +240,7 @@ class DataQuality(Base):
     """
     __tablename__ = "data_quality"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     table_name = Column(String(50), nullable=False)      # Which table was checked
     series_id = Column(String(50), nullable=True)        # Which series (if applicable)
     check_type = Column(String(50), nullable=False)      # Type of check
@@ -155,6 +274,19 @@ class PriceResponse(BaseModel):
         from_attributes = True  # Allows converting from SQLAlchemy model
 
 
+class LatestPrice(BaseModel):
+    """Response model for one series in /prices/latest"""
+    date: date
+    value: float
+    previous: Optional[float]
+    change: float
+    changePercent: float
+    unit: Optional[str]
+    source: str
+    high: float   # 30-day high
+    low: float    # 30-day low
+
+
 class InventoryResponse(BaseModel):
     """Response model for inventory data"""
     id: int
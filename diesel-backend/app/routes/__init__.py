@@ -2,12 +2,12 @@
 Routes Package
 
 This package contains all the API route modules.
+
+The routers are loaded lazily: `from app.routes import prices_router` only
+imports the prices module (and its dependencies) the first time it's used.
 """
 
-from app.routes.health import router as health_router
-from app.routes.prices import router as prices_router
-from app.routes.inventories import router as inventories_router
-from app.routes.fetch import router as fetch_router
+import importlib
 
 __all__ = [
     "health_router",
@@ -15,3 +15,11 @@ __all__ = [
     "inventories_router",
     "fetch_router",
 ]
+
+
+def __getattr__(name):
+    """Import a route module on first access to its '<module>_router' name"""
+    if name in __all__:
+        module = importlib.import_module(f"app.routes.{name[:-len('_router')]}")
+        return module.router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
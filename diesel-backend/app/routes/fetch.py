@@ -3,49 +3,124 @@ Fetch Routes
 
 API endpoints for triggering data fetches from FRED and EIA.
 These endpoints let you manually pull new data into the database.
+
+The bulk endpoints (/fred/all, /eia/all, /all) run in the background:
+they answer right away with a job id, and /fetch/status/{job_id} shows
+how the job is going.
+
+Handlers that only touch the database (creating a job, reading the status)
+are plain `def`, so FastAPI runs them in its threadpool - a write waiting
+on a busy database never stalls the event loop.
 """
 
-from fastapi import APIRouter, Depends, Query, BackgroundTasks
+import asyncio
+
+from fastapi import APIRouter, Depends, Query, BackgroundTasks, Response, HTTPException
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from datetime import date, timedelta
-from typing import Optional
+from sqlalchemy.dialects.sqlite import insert
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict
 
-from app.database import get_db, run_query
+from app.database import get_db, run_query, SessionLocal
+from app.models import FetchLog
+from app.fetchers import fred
 from app.fetchers.fred import fetch_and_store_series, fetch_all_series, FRED_SERIES
 from app.fetchers.eia import fetch_and_store_stocks, fetch_all_stocks, EIA_AREAS
 
 router = APIRouter(prefix="/fetch", tags=["fetch"])
 
 
-@router.post("/fred/{series_id}")
-async def fetch_fred_series(
-    series_id: str,
-    months: int = Query(24, ge=1, le=120, description="Months of history to fetch"),
-    db: Session = Depends(get_db),
-):
+# Background jobs: each job is a row in fetch_log (its id is the job id) that
+# moves through queued -> running -> completed (or partial / error, if some or
+# all of its fetches failed). The per-series and per-region rows the fetchers
+# write still show up next to it in /fetch/status. Job rows are the ones with
+# series_id JOB_SERIES_ID.
+JOB_SERIES_ID = "all"
+
+
+def _create_job(source: str, endpoint: str) -> int:
+    """Add a 'queued' fetch_log row for a background fetch and return its id."""
+    with SessionLocal() as db:
+        job_id = db.execute(
+            insert(FetchLog).values(
+                source=source,
+                endpoint=endpoint,
+                series_id=JOB_SERIES_ID,
+                status="queued",
+                started_at=datetime.now(),
+            )
+        ).inserted_primary_key[0]
+        db.commit()
+    return job_id
+
+
+def _update_job(job_id: int, **values):
+    """Update a job's fetch_log row."""
+    with SessionLocal() as db:
+        db.execute(update(FetchLog).where(FetchLog.id == job_id).values(**values))
+        db.commit()
+
+
+async def _run_with_session(fetch_all, months: int) -> List[Dict]:
+    """Run one of the fetch_all_* functions on its own short-lived session."""
+    db = SessionLocal()
+    try:
+        return await fetch_all(db, months=months)
+    finally:
+        db.close()
+
+
+async def _run_fetch_job(job_id: int, fetch_alls: List, months: int):
     """
-    Fetch a specific FRED series and store in database.
+    The background part of a bulk fetch.
     
-    Path Parameters:
-    - series_id: The FRED series ID (DCOILBRENTEU, DCOILWTICO, DDFUELUSGULF, DDFUELNYH)
-    
-    Query Parameters:
-    - months: How many months of history (default 24)
+    Runs every fetch_all_* function in `fetch_alls` at the same time - each on
+    its own session - then records the outcome on the job's fetch_log row.
     """
-    if series_id not in FRED_SERIES:
-        return {
-            "success": False,
-            "error": f"Unknown series. Valid options: {', '.join(FRED_SERIES.keys())}",
-        }
+    # The fetch_log writes are ordinary blocking database calls - run them in
+    # a worker thread so a busy database never holds up the event loop
+    await asyncio.to_thread(_update_job, job_id, status="running")
     
-    result = await fetch_and_store_series(db, series_id, months=months)
-    return result
+    try:
+        batches = await asyncio.gather(*(_run_with_session(f, months) for f in fetch_alls))
+    except Exception as e:
+        await asyncio.to_thread(
+            _update_job, job_id, status="error", error_message=str(e), completed_at=datetime.now()
+        )
+        return
+    
+    results = [r for batch in batches for r in batch]
+    failed = [
+        f"{r.get('series_id') or r.get('region', 'unknown')}: {r.get('error')}"
+        for r in results if not r.get("success")
+    ]
+    
+    # completed = everything fetched, partial = some failed, error = all failed
+    if not failed:
+        status = "completed"
+    elif len(failed) < len(results):
+        status = "partial"
+    else:
+        status = "error"
+    
+    await asyncio.to_thread(
+        _update_job,
+        job_id,
+        status=status,
+        records_fetched=sum(r.get("records_fetched", 0) for r in results if r.get("success")),
+        error_message=f"{len(failed)}/{len(results)} failed - {'; '.join(failed)}" if failed else None,
+        completed_at=datetime.now(),
+    )
+
 
+# The bulk endpoints must be declared before /fred/{series_id} and
+# /eia/{area_code} - otherwise "all" is matched as a series id / area code.
 
-@router.post("/fred/all")
-async def fetch_all_fred(
+@router.post("/fred/all", status_code=202)
+def fetch_all_fred(
+    background_tasks: BackgroundTasks,
     months: int = Query(24, ge=1, le=120, description="Months of history to fetch"),
-    db: Session = Depends(get_db),
 ):
     """
     Fetch ALL FRED price series and store in database.
@@ -56,50 +131,20 @@ async def fetch_all_fred(
     - ULSD Gulf Coast (DDFUELUSGULF)
     - ULSD NY Harbor (DDFUELNYH)
     
-    Query Parameters:
-    - months: How many months of history (default 24)
-    """
-    results = await fetch_all_series(db, months=months)
-    
-    success_count = sum(1 for r in results if r.get("success"))
-    total_records = sum(r.get("records_fetched", 0) for r in results if r.get("success"))
-    
-    return {
-        "message": f"Fetched {success_count}/{len(results)} series",
-        "total_records": total_records,
-        "results": results,
-    }
-
-
-@router.post("/eia/{area_code}")
-async def fetch_eia_area(
-    area_code: str,
-    months: int = Query(24, ge=1, le=120, description="Months of history to fetch"),
-    db: Session = Depends(get_db),
-):
-    """
-    Fetch distillate stocks for a specific EIA area and store in database.
-    
-    Path Parameters:
-    - area_code: EIA area code (NUS=US Total, R10-R50 for PADDs)
+    Runs in the background - poll /fetch/status/{job_id} for the result.
     
     Query Parameters:
     - months: How many months of history (default 24)
     """
-    if area_code not in EIA_AREAS:
-        return {
-            "success": False,
-            "error": f"Unknown area. Valid options: {', '.join(EIA_AREAS.keys())}",
-        }
-    
-    result = await fetch_and_store_stocks(db, area_code, months=months)
-    return result
+    job_id = _create_job("FRED", "/fetch/fred/all")
+    background_tasks.add_task(_run_fetch_job, job_id, [fetch_all_series], months)
+    return {"job_id": job_id, "status": "queued"}
 
 
-@router.post("/eia/all")
-async def fetch_all_eia(
+@router.post("/eia/all", status_code=202)
+def fetch_all_eia(
+    background_tasks: BackgroundTasks,
     months: int = Query(24, ge=1, le=120, description="Months of history to fetch"),
-    db: Session = Depends(get_db),
 ):
     """
     Fetch distillate stocks for ALL regions and store in database.
@@ -112,25 +157,20 @@ async def fetch_all_eia(
     - PADD 4 Rocky Mountain (R40)
     - PADD 5 West Coast (R50)
     
+    Runs in the background - poll /fetch/status/{job_id} for the result.
+    
     Query Parameters:
     - months: How many months of history (default 24)
     """
-    results = await fetch_all_stocks(db, months=months)
-    
-    success_count = sum(1 for r in results if r.get("success"))
-    total_records = sum(r.get("records_fetched", 0) for r in results if r.get("success"))
-    
-    return {
-        "message": f"Fetched {success_count}/{len(results)} regions",
-        "total_records": total_records,
-        "results": results,
-    }
+    job_id = _create_job("EIA", "/fetch/eia/all")
+    background_tasks.add_task(_run_fetch_job, job_id, [fetch_all_stocks], months)
+    return {"job_id": job_id, "status": "queued"}
 
 
-@router.post("/all")
-async def fetch_everything(
+@router.post("/all", status_code=202)
+def fetch_everything(
+    background_tasks: BackgroundTasks,
     months: int = Query(24, ge=1, le=120, description="Months of history to fetch"),
-    db: Session = Depends(get_db),
 ):
     """
     Fetch ALL data from both FRED and EIA.
@@ -139,40 +179,69 @@ async def fetch_everything(
     - All FRED price series (4 series)
     - All EIA inventory data (6 regions)
     
+    FRED and EIA are fetched at the same time, in the background -
+    poll /fetch/status/{job_id} for the result.
+    
     Query Parameters:
     - months: How many months of history (default 24)
     """
-    # Fetch FRED
-    print("🔄 Starting FRED fetch...")
-    fred_results = await fetch_all_series(db, months=months)
+    job_id = _create_job("ALL", "/fetch/all")
+    background_tasks.add_task(_run_fetch_job, job_id, [fetch_all_series, fetch_all_stocks], months)
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.post("/fred/{series_id}")
+async def fetch_fred_series(
+    series_id: str,
+    months: int = Query(24, ge=1, le=120, description="Months of history to fetch"),
+    db: Session = Depends(get_db),
+):
+    """
+    Fetch a specific FRED series and store in database.
     
-    # Fetch EIA
-    print("🔄 Starting EIA fetch...")
-    eia_results = await fetch_all_stocks(db, months=months)
+    Path Parameters:
+    - series_id: The FRED series ID (DCOILBRENTEU, DCOILWTICO, DDFUELUSGULF, DDFUELNYH)
     
-    # Summarize
-    fred_success = sum(1 for r in fred_results if r.get("success"))
-    fred_records = sum(r.get("records_fetched", 0) for r in fred_results if r.get("success"))
+    Query Parameters:
+    - months: How many months of history (default 24)
+    """
+    if series_id not in FRED_SERIES:
+        return {
+            "success": False,
+            "error": f"Unknown series. Valid options: {', '.join(FRED_SERIES.keys())}",
+        }
     
-    eia_success = sum(1 for r in eia_results if r.get("success"))
-    eia_records = sum(r.get("records_fetched", 0) for r in eia_results if r.get("success"))
+    result = await fetch_and_store_series(db, series_id, months=months)
+    return result
+
+
+@router.post("/eia/{area_code}")
+async def fetch_eia_area(
+    area_code: str,
+    months: int = Query(24, ge=1, le=120, description="Months of history to fetch"),
+    db: Session = Depends(get_db),
+):
+    """
+    Fetch distillate stocks for a specific EIA area and store in database.
     
-    return {
-        "message": "Fetch complete",
-        "fred": {
-            "series_fetched": f"{fred_success}/{len(fred_results)}",
-            "records": fred_records,
-        },
-        "eia": {
-            "regions_fetched": f"{eia_success}/{len(eia_results)}",
-            "records": eia_records,
-        },
-        "total_records": fred_records + eia_records,
-    }
+    Path Parameters:
+    - area_code: EIA area code (NUS=US Total, R10-R50 for PADDs)
+    
+    Query Parameters:
+    - months: How many months of history (default 24)
+    """
+    if area_code not in EIA_AREAS:
+        return {
+            "success": False,
+            "error": f"Unknown area. Valid options: {', '.join(EIA_AREAS.keys())}",
+        }
+    
+    result = await fetch_and_store_stocks(db, area_code, months=months)
+    return result
 
 
 @router.get("/status")
-async def fetch_status(db: Session = Depends(get_db)):
+def fetch_status(db: Session = Depends(get_db)):
     """
     Get status of recent fetch operations.
     
@@ -200,6 +269,40 @@ async def fetch_status(db: Session = Depends(get_db)):
     }
 
 
+@router.get("/status/{job_id}")
+def fetch_job_status(job_id: int):
+    """
+    Get the status of one background fetch job.
+    
+    Path Parameters:
+    - job_id: The id returned by /fetch/all, /fetch/fred/all or /fetch/eia/all
+    
+    Status goes queued -> running -> completed - or partial if some of the
+    fetches failed, error if all of them did (error_message lists which).
+    """
+    sql = """
+        SELECT 
+            id AS job_id,
+            source,
+            endpoint,
+            status,
+            records_fetched,
+            started_at,
+            completed_at,
+            error_message
+        FROM fetch_log
+        WHERE id = :job_id AND series_id = :job_series_id
+    """
+    
+    # Only job rows - the fetchers' per-series rows aren't jobs
+    results = run_query(sql, {"job_id": job_id, "job_series_id": JOB_SERIES_ID})
+    
+    if not results:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    return results[0]
+
+
 @router.get("/fred/proxy/{series_id}")
 async def proxy_fred_series(
     series_id: str,
@@ -215,14 +318,10 @@ async def proxy_fred_series(
     Query Parameters:
     - limit: Number of observations to return (default 30)
     """
-    import os
-    import httpx
-    
-    api_key = os.getenv("FRED_API_KEY")
+    api_key = fred.get_api_key()
     if not api_key:
         return {"success": False, "error": "FRED API key not configured"}
     
-    url = f"https://api.stlouisfed.org/fred/series/observations"
     params = {
         "series_id": series_id,
         "api_key": api_key,
@@ -232,10 +331,16 @@ async def proxy_fred_series(
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, timeout=10.0)
-            response.raise_for_status()
-            return response.json()
+        # Reuse the fetcher's pooled client - no new TCP/TLS handshake per request
+        # ...and count against the same FRED request limit as the fetchers
+        async with fred.get_semaphore():
+            response = await fred.get_client().get(
+                f"{fred.FRED_BASE_URL}/series/observations", params=params, timeout=10.0
+            )
+        response.raise_for_status()
+        # FRED already sent JSON - pass the bytes straight through instead of
+        # parsing them into Python objects only to serialize them again
+        return Response(content=response.content, media_type="application/json")
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -5,7 +5,11 @@ Simple endpoint to check if the backend is running properly.
 This is useful for monitoring and for the React frontend to verify connectivity.
 """
 
+import asyncio
+import time
+
 from fastapi import APIRouter, Depends
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from datetime import datetime
 
@@ -13,6 +17,10 @@ from app.database import get_db
 
 router = APIRouter(prefix="/health", tags=["health"])
 
+# How long a successful /health/db check is reused before querying again
+HEALTHY_CACHE_SECONDS = 1.0
+_last_healthy_at = 0.0  # time.monotonic() of the last successful check
+
 
 @router.get("")
 async def health_check():
@@ -34,12 +42,25 @@ async def database_check(db: Session = Depends(get_db)):
     Check database connectivity.
     
     Runs a simple query to verify the database is accessible.
+    A healthy result is reused for 1 second, so monitoring tools that poll
+    this endpoint in a tight loop don't each hit the database.
     """
+    global _last_healthy_at
+    
+    if time.monotonic() - _last_healthy_at < HEALTHY_CACHE_SECONDS:
+        return {
+            "status": "healthy",
+            "database": "connected",
+            "timestamp": datetime.now().isoformat(),
+        }
+    
     try:
-        # Simple query to test database connection
-        result = db.execute("SELECT 1").fetchone()
+        # Simple query to test database connection - run in a worker thread,
+        # since the database call blocks and this handler is on the event loop
+        result = await asyncio.to_thread(lambda: db.execute(text("SELECT 1")).scalar())
         
         if result:
+            _last_healthy_at = time.monotonic()
             return {
                 "status": "healthy",
                 "database": "connected",
@@ -3,22 +3,35 @@ Inventories Routes
 
 API endpoints for retrieving inventory (stock) data from the database.
 These endpoints provide distillate inventory data by PADD region.
+
+The handlers are plain `def` (not `async def`) on purpose: the database calls
+are blocking, so FastAPI runs each request in its threadpool instead of on
+the event loop - one slow query no longer stalls every other request.
 """
 
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from datetime import date, timedelta
+from sqlalchemy import desc, select
+from datetime import date
+from dateutil.relativedelta import relativedelta
 from typing import Optional, List
 
+from app.cache import cached
 from app.database import get_db, run_query
 from app.models import Inventory
+from app.fetchers.eia import REGION_ORDER
 
 router = APIRouter(prefix="/inventories", tags=["inventories"])
 
 
+def _region_sort_key(row) -> tuple:
+    """Sort US first, then PADD1-PADD5 (any unknown region goes last)."""
+    return (REGION_ORDER.get(row["region"], len(REGION_ORDER)), row["region"])
+
+
 @router.get("")
-async def get_inventories(
+def get_inventories(
     region: Optional[str] = Query(None, description="Filter by region (US, PADD1-PADD5)"),
     product: Optional[str] = Query(None, description="Filter by product (distillate)"),
     start_date: Optional[date] = Query(None, description="Start of date range"),
@@ -38,83 +51,55 @@ async def get_inventories(
     - end_date: End of date range
     - limit: Maximum number of records (default 500)
     """
-    query = db.query(Inventory)
+    # Select the columns directly (Core) - rows come back dict-like and ready
+    # for the JSON response, without building ORM objects first
+    query = select(
+        Inventory.id,
+        Inventory.source,
+        Inventory.region,
+        Inventory.product,
+        Inventory.date,
+        Inventory.value,
+        Inventory.unit,
+        Inventory.fetched_at,
+    )
     
     if region:
-        query = query.filter(Inventory.region == region)
+        query = query.where(Inventory.region == region)
     
     if product:
-        query = query.filter(Inventory.product == product)
+        query = query.where(Inventory.product == product)
     
     if start_date:
-        query = query.filter(Inventory.date >= str(start_date))
+        query = query.where(Inventory.date >= start_date)
     
     if end_date:
-        query = query.filter(Inventory.date <= str(end_date))
+        query = query.where(Inventory.date <= end_date)
     
     query = query.order_by(desc(Inventory.date)).limit(limit)
     
-    results = query.all()
-    
-    # Convert to dict for JSON response
-    return [
-        {
-            "id": inv.id,
-            "source": inv.source,
-            "region": inv.region,
-            "product": inv.product,
-            "date": inv.date,
-            "value": inv.value,
-            "unit": inv.unit,
-            "fetched_at": inv.fetched_at.isoformat() if inv.fetched_at else None,
-        }
-        for inv in results
-    ]
+    # Return the response ourselves so orjson serializes the rows in one go,
+    # without FastAPI's per-row jsonable_encoder pass
+    rows = db.execute(query).mappings()
+    return ORJSONResponse([dict(row) for row in rows])
 
 
-@router.get("/latest")
-async def get_latest_inventories(db: Session = Depends(get_db)):
-    """
-    Get the most recent inventory reading for each region with change calculations.
-    
-    Returns a dictionary with each region and its latest stock level, previous value,
-    and calculated change.
-    """
+def _load_latest_inventories() -> dict:
+    """Build the /inventories/latest response (only runs when it isn't cached)."""
+    # One row per region, kept up to date by the EIA fetcher
     sql = """
-        WITH RankedInventories AS (
-            SELECT 
-                region,
-                product,
-                date, 
-                value, 
-                unit, 
-                source,
-                ROW_NUMBER() OVER (PARTITION BY region, product ORDER BY date DESC) as rn
-            FROM inventories
-        )
         SELECT 
             region,
             product,
-            MAX(CASE WHEN rn = 1 THEN date END) as latest_date,
-            MAX(CASE WHEN rn = 1 THEN value END) as latest_value,
-            MAX(CASE WHEN rn = 2 THEN value END) as previous_value,
-            MAX(CASE WHEN rn = 1 THEN unit END) as unit,
-            MAX(CASE WHEN rn = 1 THEN source END) as source
-        FROM RankedInventories
-        WHERE rn <= 2
-        GROUP BY region, product
-        ORDER BY 
-            CASE region
-                WHEN 'US' THEN 0
-                WHEN 'PADD1' THEN 1
-                WHEN 'PADD2' THEN 2
-                WHEN 'PADD3' THEN 3
-                WHEN 'PADD4' THEN 4
-                WHEN 'PADD5' THEN 5
-            END
+            date as latest_date,
+            value as latest_value,
+            previous as previous_value,
+            unit,
+            source
+        FROM latest_inventories
     """
     
-    results = run_query(sql)
+    results = sorted(run_query(sql), key=_region_sort_key)
     
     # Format as dictionary with change calculations
     latest = {}
@@ -138,39 +123,36 @@ async def get_latest_inventories(db: Session = Depends(get_db)):
     return latest
 
 
-@router.get("/regions")
-async def list_regions(db: Session = Depends(get_db)):
+@router.get("/latest")
+def get_latest_inventories(db: Session = Depends(get_db)):
     """
-    List all available regions with metadata.
+    Get the most recent inventory reading for each region with change calculations.
     
-    Returns info about each region including:
-    - Number of records
-    - Date range
-    - Latest value
+    Returns a dictionary with each region and its latest stock level, previous value,
+    and calculated change.
+    
+    Cached for up to a minute, and cleared whenever a fetch stores new inventories.
     """
+    return cached("latest_inventories", _load_latest_inventories)
+
+
+def _load_regions() -> dict:
+    """Build the /inventories/regions response (only runs when it isn't cached)."""
+    # Counts, date ranges and latest values are kept in latest_inventories
+    # by the EIA fetcher
     sql = """
         SELECT 
             region,
             product,
             source,
-            COUNT(*) as record_count,
-            MIN(date) as first_date,
-            MAX(date) as last_date,
-            (SELECT value FROM inventories i2 WHERE i2.region = i1.region AND i2.date = MAX(i1.date)) as latest_value
-        FROM inventories i1
-        GROUP BY region, product
-        ORDER BY 
-            CASE region
-                WHEN 'US' THEN 0
-                WHEN 'PADD1' THEN 1
-                WHEN 'PADD2' THEN 2
-                WHEN 'PADD3' THEN 3
-                WHEN 'PADD4' THEN 4
-                WHEN 'PADD5' THEN 5
-            END
+            records as record_count,
+            first_date,
+            date as last_date,
+            value as latest_value
+        FROM latest_inventories
     """
     
-    results = run_query(sql)
+    results = sorted(run_query(sql), key=_region_sort_key)
     
     return {
         "regions": results,
@@ -178,8 +160,23 @@ async def list_regions(db: Session = Depends(get_db)):
     }
 
 
+@router.get("/regions")
+def list_regions(db: Session = Depends(get_db)):
+    """
+    List all available regions with metadata.
+    
+    Returns info about each region including:
+    - Number of records
+    - Date range
+    - Latest value
+    
+    Cached for up to a minute, and cleared whenever a fetch stores new inventories.
+    """
+    return cached("inventory_regions", _load_regions)
+
+
 @router.get("/history/{region}")
-async def get_region_history(
+def get_region_history(
     region: str,
     months: int = Query(12, ge=1, le=60, description="Months of history"),
     db: Session = Depends(get_db),
@@ -193,28 +190,29 @@ async def get_region_history(
     Query Parameters:
     - months: How many months of history (default 12)
     """
-    start_date = date.today() - timedelta(days=months * 30)
+    start_date = date.today() - relativedelta(months=months)  # Exact calendar months
     
-    query = db.query(Inventory).filter(
+    # Only the two columns we return - no ORM objects to build
+    query = select(Inventory.date, Inventory.value).where(
         Inventory.region == region.upper(),
-        Inventory.date >= str(start_date),
+        Inventory.date >= start_date,
     ).order_by(desc(Inventory.date))
     
-    results = query.all()
+    results = db.execute(query).all()
     
     if not results:
         raise HTTPException(status_code=404, detail=f"No data found for region {region}")
     
-    return {
+    return ORJSONResponse({
         "region": region.upper(),
         "records": len(results),
         "start_date": str(start_date),
-        "data": [{"date": inv.date, "value": inv.value} for inv in results],
-    }
+        "data": [{"date": inv_date, "value": value} for inv_date, value in results],
+    })
 
 
 @router.get("/compare")
-async def compare_regions(
+def compare_regions(
     regions: str = Query("US,PADD1,PADD3", description="Comma-separated list of regions"),
     months: int = Query(12, ge=1, le=60, description="Months of history"),
     db: Session = Depends(get_db),
@@ -227,21 +225,20 @@ async def compare_regions(
     - months: How many months of history
     """
     region_list = [r.strip().upper() for r in regions.split(",")]
-    start_date = date.today() - timedelta(days=months * 30)
+    start_date = date.today() - relativedelta(months=months)  # Exact calendar months
     
-    result = {}
+    # One query for all the regions, then split the rows up by region
+    query = select(Inventory.region, Inventory.date, Inventory.value).where(
+        Inventory.region.in_(region_list),
+        Inventory.date >= start_date,
+    ).order_by(Inventory.region, Inventory.date)
     
-    for region in region_list:
-        query = db.query(Inventory).filter(
-            Inventory.region == region,
-            Inventory.date >= str(start_date),
-        ).order_by(Inventory.date)
-        
-        data = query.all()
-        result[region] = [{"date": inv.date, "value": inv.value} for inv in data]
+    result = {region: [] for region in region_list}
+    for region, inv_date, value in db.execute(query):
+        result[region].append({"date": inv_date, "value": value})
     
-    return {
+    return ORJSONResponse({
         "regions": region_list,
         "months": months,
         "data": result,
-    }
+    })
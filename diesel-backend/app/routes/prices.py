@@ -3,22 +3,28 @@ Prices Routes
 
 API endpoints for retrieving price data from the database.
 These endpoints are consumed by the React dashboard.
+
+The handlers are plain `def` (not `async def`) on purpose: the database calls
+are blocking, so FastAPI runs each request in its threadpool instead of on
+the event loop - one slow query no longer stalls every other request.
 """
 
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, select
 from datetime import date, timedelta
-from typing import Optional, List
+from typing import Optional, List, Dict
 
+from app.cache import cached
 from app.database import get_db, run_query
-from app.models import Price, PriceResponse
+from app.models import Price, PriceResponse, LatestPrice
 
 router = APIRouter(prefix="/prices", tags=["prices"])
 
 
 @router.get("", response_model=List[PriceResponse])
-async def get_prices(
+def get_prices(
     series_id: Optional[str] = Query(None, description="Filter by series ID (e.g., DCOILBRENTEU)"),
     start_date: Optional[date] = Query(None, description="Start of date range"),
     end_date: Optional[date] = Query(None, description="End of date range"),
@@ -36,58 +42,62 @@ async def get_prices(
     - end_date: End of date range
     - limit: Maximum number of records (default 500)
     """
-    query = db.query(Price)
+    # Select the columns directly (Core) - plain rows are much cheaper to build
+    # and serialize than full ORM objects
+    query = select(
+        Price.id,
+        Price.source,
+        Price.series_id,
+        Price.date,
+        Price.value,
+        Price.unit,
+        Price.fetched_at,
+    )
     
     if series_id:
-        query = query.filter(Price.series_id == series_id)
+        query = query.where(Price.series_id == series_id)
     
     if start_date:
-        query = query.filter(Price.date >= str(start_date))
+        query = query.where(Price.date >= start_date)
     
     if end_date:
-        query = query.filter(Price.date <= str(end_date))
+        query = query.where(Price.date <= end_date)
     
     # Order by date descending (most recent first)
     query = query.order_by(desc(Price.date)).limit(limit)
     
-    results = query.all()
-    return results
+    # Return the response ourselves: orjson serializes the plain dicts (dates
+    # included) in one C call, skipping FastAPI's per-row validation and
+    # jsonable_encoder pass. response_model above still documents the shape.
+    rows = db.execute(query).mappings()
+    return ORJSONResponse([dict(row) for row in rows])
 
 
-@router.get("/latest")
-async def get_latest_prices(db: Session = Depends(get_db)):
-    """
-    Get the most recent price for each series with change calculations.
-    
-    Returns a dictionary with each series ID and its latest value, previous value,
-    and calculated changes.
-    """
-    # SQL query to get the latest and previous price for each series
+def _load_latest_prices() -> Dict[str, LatestPrice]:
+    """Build the /prices/latest response (only runs when it isn't cached)."""
+    # The latest/previous prices come from the small latest_prices table the
+    # FRED fetcher keeps up to date; the 30-day high/low depend on today's
+    # date, so they're read per series off the (series_id, date DESC, value) index
     sql = """
-        WITH RankedPrices AS (
-            SELECT 
-                series_id, 
-                date, 
-                value, 
-                unit, 
-                source,
-                ROW_NUMBER() OVER (PARTITION BY series_id ORDER BY date DESC) as rn
-            FROM prices
-        )
         SELECT 
-            series_id,
-            MAX(CASE WHEN rn = 1 THEN date END) as latest_date,
-            MAX(CASE WHEN rn = 1 THEN value END) as latest_value,
-            MAX(CASE WHEN rn = 2 THEN value END) as previous_value,
-            MAX(CASE WHEN rn = 1 THEN unit END) as unit,
-            MAX(CASE WHEN rn = 1 THEN source END) as source
-        FROM RankedPrices
-        WHERE rn <= 2
-        GROUP BY series_id
-        ORDER BY series_id
+            l.series_id,
+            l.date as latest_date,
+            l.value as latest_value,
+            l.previous as previous_value,
+            l.unit,
+            l.source,
+            MAX(p.value) as high_30d,
+            MIN(p.value) as low_30d
+        FROM latest_prices l
+        LEFT JOIN prices p
+            ON p.series_id = l.series_id
+            AND p.date >= :since
+        GROUP BY l.series_id
+        ORDER BY l.series_id
     """
     
-    results = run_query(sql)
+    since = date.today() - timedelta(days=30)
+    results = run_query(sql, {"since": since.isoformat()})
     
     # Format as dictionary with change calculations
     latest = {}
@@ -99,42 +109,49 @@ async def get_latest_prices(db: Session = Depends(get_db)):
         change = current - previous if previous else 0
         change_percent = (change / previous * 100) if previous and previous != 0 else 0
         
-        latest[row["series_id"]] = {
-            "date": row["latest_date"],
-            "value": current,
-            "previous": previous,
-            "change": round(change, 4),
-            "changePercent": round(change_percent, 2),
-            "unit": row["unit"],
-            "source": row["source"],
-            # Placeholder for high/low (could calculate from last N days)
-            "high": current,  # TODO: Calculate actual high
-            "low": current,   # TODO: Calculate actual low
-        }
+        # Validated here, once per cache fill - FastAPI then serializes the
+        # cached models directly instead of re-checking plain dicts per request
+        latest[row["series_id"]] = LatestPrice(
+            date=row["latest_date"],
+            value=current,
+            previous=previous,
+            change=round(change, 4),
+            changePercent=round(change_percent, 2),
+            unit=row["unit"],
+            source=row["source"],
+            # 30-day range (falls back to the latest value if nothing is that recent)
+            high=row["high_30d"] if row["high_30d"] is not None else current,
+            low=row["low_30d"] if row["low_30d"] is not None else current,
+        )
     
     return latest
 
 
-@router.get("/series")
-async def list_series(db: Session = Depends(get_db)):
+@router.get("/latest", response_model=Dict[str, LatestPrice])
+def get_latest_prices(db: Session = Depends(get_db)):
     """
-    List all available price series with metadata.
+    Get the most recent price for each series with change calculations.
     
-    Returns info about each series including:
-    - Number of records
-    - Date range
-    - Latest value
+    Returns a dictionary with each series ID and its latest value, previous value,
+    and calculated changes.
+    
+    Cached for up to a minute, and cleared whenever a fetch stores new prices.
     """
+    return cached("latest_prices", _load_latest_prices)
+
+
+def _load_series() -> dict:
+    """Build the /prices/series response (only runs when it isn't cached)."""
+    # Counts and date ranges are kept in latest_prices by the FRED fetcher
     sql = """
         SELECT 
             series_id,
             source,
             unit,
-            COUNT(*) as record_count,
-            MIN(date) as first_date,
-            MAX(date) as last_date
-        FROM prices
-        GROUP BY series_id
+            records as record_count,
+            first_date,
+            date as last_date
+        FROM latest_prices
         ORDER BY series_id
     """
     
@@ -146,8 +163,23 @@ async def list_series(db: Session = Depends(get_db)):
     }
 
 
+@router.get("/series")
+def list_series(db: Session = Depends(get_db)):
+    """
+    List all available price series with metadata.
+    
+    Returns info about each series including:
+    - Number of records
+    - Date range
+    - Latest value
+    
+    Cached for up to a minute, and cleared whenever a fetch stores new prices.
+    """
+    return cached("price_series", _load_series)
+
+
 @router.get("/{series_id}")
-async def get_series(
+def get_series(
     series_id: str,
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
@@ -163,21 +195,22 @@ async def get_series(
     - start_date: Beginning of date range
     - end_date: End of date range
     """
-    query = db.query(Price).filter(Price.series_id == series_id)
+    # Only the two columns we return - no ORM objects to build
+    query = select(Price.date, Price.value).where(Price.series_id == series_id)
     
     if start_date:
-        query = query.filter(Price.date >= str(start_date))
+        query = query.where(Price.date >= start_date)
     
     if end_date:
-        query = query.filter(Price.date <= str(end_date))
+        query = query.where(Price.date <= end_date)
     
-    results = query.order_by(desc(Price.date)).all()
+    results = db.execute(query.order_by(desc(Price.date))).all()
     
     if not results:
         raise HTTPException(status_code=404, detail=f"Series {series_id} not found")
     
-    return {
+    return ORJSONResponse({
         "series_id": series_id,
         "records": len(results),
-        "data": [{"date": p.date, "value": p.value} for p in results],
-    }
+        "data": [{"date": price_date, "value": value} for price_date, value in results],
+    })
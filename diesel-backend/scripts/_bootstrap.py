@@ -0,0 +1,34 @@
+"""
+Shared setup for the scripts in this folder.
+
+Every script starts with `import _bootstrap` (before any `app` import),
+which loads the .env file - the project root's if there is one, otherwise
+the backend folder's. export_csv.py also uses BACKEND_DIR from here.
+
+The `app` package itself is found because it's installed (`pip install -e .`
+from the diesel-backend folder - see pyproject.toml).
+
+Python only runs a module the first time it is imported, so this happens once
+per process no matter how many scripts or modules import it.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
+
+
+def find_env_file():
+    """Return the .env file to load (root first, then backend folder), or None."""
+    for folder in (PROJECT_ROOT, BACKEND_DIR):
+        path = os.path.join(folder, ".env")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+ENV_FILE = find_env_file()
+if ENV_FILE:
+    load_dotenv(ENV_FILE, override=True)
@@ -5,165 +5,240 @@ A simple interactive tool to explore your database.
 Run this whenever you want to check what's in the database.
 """
 
-import os
 import sys
+from contextlib import contextmanager
 
-# Add parent directory to path
-BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
-sys.path.insert(0, BACKEND_DIR)
+import _bootstrap  # loads .env
 
-from dotenv import load_dotenv
-# Load .env - check root first, then backend folder
-root_env = os.path.join(PROJECT_ROOT, ".env")
-backend_env = os.path.join(BACKEND_DIR, ".env")
-if os.path.exists(root_env):
-    load_dotenv(root_env, override=True)
-elif os.path.exists(backend_env):
-    load_dotenv(backend_env, override=True)
+from sqlalchemy import text
 
-from app.database import run_query
+from app.database import engine, init_db_if_needed, run_query
 
 
-def show_tables():
+def show_tables(conn):
     """Show all tables in the database"""
-    tables = run_query("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+    tables = run_query("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name", conn=conn)
     print("\n📋 Tables in database:")
     for t in tables:
         print(f"   - {t['name']}")
     return [t['name'] for t in tables]
 
 
-def show_table_info(table_name):
-    """Show info about a specific table"""
-    # Get column info
-    columns = run_query(f"PRAGMA table_info({table_name})")
+def show_table_info(conn, table_name, exact=False):
+    """
+    Show info about a specific table.
+    
+    The row count is approximate unless exact=True - see below.
+    """
+    # Get column info - pragma_table_info() takes the table name as a query
+    # parameter, so the SQL text is the same for every table and SQLite's
+    # prepared-statement cache can reuse it
+    columns = run_query("SELECT name, type FROM pragma_table_info(:table_name)", {"table_name": table_name}, conn=conn)
     print(f"\n📊 Table: {table_name}")
     print("-" * 40)
     print("Columns:")
     for col in columns:
         print(f"   {col['name']}: {col['type']}")
     
-    # Get row count
-    count = run_query(f"SELECT COUNT(*) as count FROM {table_name}")
-    print(f"\nTotal rows: {count[0]['count']}")
+    # Get row count. COUNT(*) has to read the whole table, but the highest
+    # rowid is found straight away - and since our tables hardly ever delete
+    # rows, it's (almost) the same number.
+    if exact:
+        count = run_query(f"SELECT COUNT(*) as count FROM {table_name}", conn=conn)
+        print(f"\nTotal rows: {count[0]['count']}")
+    else:
+        count = run_query(f"SELECT MAX(rowid) as count FROM {table_name}", conn=conn)
+        print(f"\nTotal rows: {count[0]['count'] or 0} (approx)")
+
+
+def write_lines(lines):
+    """
+    Print a list of lines with a single write.
+    
+    The show_* functions collect their whole output first and print it in
+    one go - one write to the terminal instead of one per line, which you
+    notice on a slow (e.g. SSH) connection.
+    """
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
-def show_sample_data(table_name, limit=5):
+def show_sample_data(conn, table_name, limit=5):
     """Show sample rows from a table"""
-    print(f"\n📝 Sample data from {table_name} (first {limit} rows):")
-    print("-" * 60)
+    lines = [
+        f"\n📝 Sample data from {table_name} (first {limit} rows):",
+        "-" * 60,
+    ]
     
-    rows = run_query(f"SELECT * FROM {table_name} ORDER BY id DESC LIMIT {limit}")
+    # Table names can't be query parameters, but the limit can. rowid works
+    # on every table, including the ones without an 'id' column.
+    # Rows come back as plain tuples and are zipped with the column names,
+    # so no name -> value mapping is built for every row of a wide table.
+    result = conn.execute(text(f"SELECT * FROM {table_name} ORDER BY rowid DESC LIMIT :limit"), {"limit": limit})
+    columns = list(result.keys())
+    rows = result.all()
     
     if not rows:
-        print("   (no data)")
-        return
+        lines.append("   (no data)")
     
-    # Print each row
+    # One block per row
     for i, row in enumerate(rows):
-        print(f"\nRow {i + 1}:")
-        for key, value in row.items():
-            print(f"   {key}: {value}")
+        lines.append(f"\nRow {i + 1}:")
+        lines.extend(f"   {key}: {value}" for key, value in zip(columns, row))
+    
+    write_lines(lines)
 
 
-def show_price_summary():
+def show_price_summary(conn):
     """Show summary of price data"""
-    print("\n💰 Price Data Summary:")
-    print("-" * 60)
+    lines = [
+        "\n💰 Price Data Summary:",
+        "-" * 60,
+    ]
     
+    # Per-series totals, kept up to date by the fetchers
     summary = run_query("""
         SELECT 
             series_id,
-            COUNT(*) as records,
-            MIN(date) as first_date,
-            MAX(date) as last_date,
-            ROUND(AVG(value), 2) as avg_price,
-            ROUND(MIN(value), 2) as min_price,
-            ROUND(MAX(value), 2) as max_price
-        FROM prices
-        GROUP BY series_id
+            records,
+            first_date,
+            date as last_date,
+            ROUND(avg_value, 2) as avg_price,
+            ROUND(min_value, 2) as min_price,
+            ROUND(max_value, 2) as max_price
+        FROM latest_prices
         ORDER BY series_id
-    """)
+    """, conn=conn)
     
     if not summary:
-        print("   (no price data)")
-        return
+        lines.append("   (no price data)")
     
     for row in summary:
-        print(f"\n{row['series_id']}:")
-        print(f"   Records: {row['records']}")
-        print(f"   Date Range: {row['first_date']} to {row['last_date']}")
-        print(f"   Price Range: ${row['min_price']} - ${row['max_price']} (avg: ${row['avg_price']})")
+        lines.append(f"\n{row['series_id']}:")
+        lines.append(f"   Records: {row['records']}")
+        lines.append(f"   Date Range: {row['first_date']} to {row['last_date']}")
+        lines.append(f"   Price Range: ${row['min_price']} - ${row['max_price']} (avg: ${row['avg_price']})")
+    
+    write_lines(lines)
 
 
-def show_inventory_summary():
+def show_inventory_summary(conn):
     """Show summary of inventory data"""
-    print("\n📦 Inventory Data Summary:")
-    print("-" * 60)
+    lines = [
+        "\n📦 Inventory Data Summary:",
+        "-" * 60,
+    ]
     
+    # Per-region totals, kept up to date by the fetchers. Regions missing
+    # from region_order go last, the same as in the API.
     summary = run_query("""
         SELECT 
             region,
-            COUNT(*) as records,
-            MIN(date) as first_date,
-            MAX(date) as last_date,
-            ROUND(AVG(value), 0) as avg_stocks,
-            ROUND(MIN(value), 0) as min_stocks,
-            ROUND(MAX(value), 0) as max_stocks
-        FROM inventories
-        GROUP BY region
-        ORDER BY CASE region
-            WHEN 'US' THEN 0
-            WHEN 'PADD1' THEN 1
-            WHEN 'PADD2' THEN 2
-            WHEN 'PADD3' THEN 3
-            WHEN 'PADD4' THEN 4
-            WHEN 'PADD5' THEN 5
-        END
-    """)
+            records,
+            first_date,
+            date as last_date,
+            ROUND(avg_value, 0) as avg_stocks,
+            ROUND(min_value, 0) as min_stocks,
+            ROUND(max_value, 0) as max_stocks
+        FROM latest_inventories
+        LEFT JOIN region_order USING (region)
+        ORDER BY position IS NULL, position, region
+    """, conn=conn)
     
     if not summary:
-        print("   (no inventory data)")
-        return
+        lines.append("   (no inventory data)")
     
     for row in summary:
-        print(f"\n{row['region']}:")
-        print(f"   Records: {row['records']}")
-        print(f"   Date Range: {row['first_date']} to {row['last_date']}")
-        print(f"   Stock Range: {int(row['min_stocks']):,} - {int(row['max_stocks']):,} KB (avg: {int(row['avg_stocks']):,})")
+        lines.append(f"\n{row['region']}:")
+        lines.append(f"   Records: {row['records']}")
+        lines.append(f"   Date Range: {row['first_date']} to {row['last_date']}")
+        lines.append(f"   Stock Range: {int(row['min_stocks']):,} - {int(row['max_stocks']):,} KB (avg: {int(row['avg_stocks']):,})")
+    
+    write_lines(lines)
+
+
+@contextmanager
+def read_only(conn):
+    """
+    Inside this block, SQLite refuses anything on `conn` that would change
+    the database (UPDATE, INSERT, DELETE, DROP, ...) - the statement fails
+    with "attempt to write a readonly database" instead.
+    """
+    conn.exec_driver_sql("PRAGMA query_only = ON")
+    try:
+        yield
+    finally:
+        conn.exec_driver_sql("PRAGMA query_only = OFF")
+
+
+# How many rows of a custom query to show
+MAX_QUERY_ROWS = 20
 
 
-def run_custom_query(sql):
+def run_custom_query(conn, sql):
     """Run a custom SQL query"""
-    print(f"\n🔍 Running query:")
-    print(f"   {sql}")
-    print("-" * 60)
+    lines = [
+        "\n🔍 Running query:",
+        f"   {sql}",
+        "-" * 60,
+    ]
     
     try:
-        results = run_query(sql)
+        # Only read the rows we'll show (plus one, to know if there are more).
+        # SQLite hands rows over as they're fetched, so SELECT * FROM prices
+        # stops after 21 rows instead of loading the whole table.
+        # The explorer only looks at data, so custom SQL runs read-only.
+        with read_only(conn):
+            result = conn.execute(text(sql))
+            try:
+                columns = list(result.keys()) if result.returns_rows else []
+                rows = result.fetchmany(MAX_QUERY_ROWS + 1) if result.returns_rows else []
+            finally:
+                result.close()
         
-        if not results:
-            print("   (no results)")
-            return
-        
-        # Print results
-        for i, row in enumerate(results):
-            if i == 0:
-                # Print header
-                print("   " + " | ".join(str(k) for k in row.keys()))
-                print("   " + "-" * 50)
+        if not rows:
+            lines.append("   (no results)")
+        else:
+            # Turn every value into text once, then size each column to its
+            # widest value (or header) so the columns line up. The last column
+            # isn't padded - nothing comes after it.
+            header = [str(k) for k in columns]
+            cells = [[str(v) for v in row] for row in rows[:MAX_QUERY_ROWS]]
+            widths = [max(len(cell) for cell in column) for column in zip(header, *cells)]
+            row_format = "   " + " | ".join([*(f"{{:<{w}}}" for w in widths[:-1]), "{}"])
             
-            print("   " + " | ".join(str(v) for v in row.values()))
+            # Header
+            lines.append(row_format.format(*header))
+            lines.append("   " + "-+-".join("-" * w for w in widths))
             
-            if i >= 19:  # Limit to 20 rows
-                print(f"   ... (showing first 20 of {len(results)} rows)")
-                break
-        
-        print(f"\nTotal rows: {len(results)}")
+            # Results
+            lines.extend(row_format.format(*row) for row in cells)
+            
+            if len(rows) > MAX_QUERY_ROWS:
+                lines.append(f"   ... (showing the first {MAX_QUERY_ROWS} rows - there are more)")
+            else:
+                lines.append(f"\nTotal rows: {len(rows)}")
         
     except Exception as e:
-        print(f"❌ Error: {e}")
+        conn.rollback()
+        if "readonly database" in str(e):
+            lines.append("❌ The explorer is read-only - UPDATE, INSERT, DELETE, DROP etc. aren't allowed")
+        else:
+            lines.append(f"❌ Error: {e}")
+    
+    write_lines(lines)
+
+
+def ask(conn, prompt):
+    """
+    input(), but first end the transaction our shared connection is in.
+    
+    Every query starts a transaction, and it stays open until it's ended.
+    Ending it before we wait for the user means we never hold one open
+    while they type - so the next choice sees the newest data, and the
+    fetchers and API are never kept waiting on us.
+    """
+    conn.rollback()
+    return input(prompt).strip()
 
 
 def main():
@@ -172,57 +247,66 @@ def main():
     print("🗄️  DATABASE EXPLORER")
     print("=" * 60)
     
-    while True:
-        print("\n📋 Menu:")
-        print("   1. Show all tables")
-        print("   2. Show price summary")
-        print("   3. Show inventory summary")
-        print("   4. Show table details")
-        print("   5. Show sample data")
-        print("   6. Run custom SQL query")
-        print("   q. Quit")
-        
-        choice = input("\nChoice: ").strip().lower()
-        
-        if choice == '1':
-            show_tables()
-        
-        elif choice == '2':
-            show_price_summary()
-        
-        elif choice == '3':
-            show_inventory_summary()
-        
-        elif choice == '4':
-            tables = show_tables()
-            table = input("\nEnter table name: ").strip()
-            if table in tables:
-                show_table_info(table)
-            else:
-                print(f"Table '{table}' not found")
-        
-        elif choice == '5':
-            tables = show_tables()
-            table = input("\nEnter table name: ").strip()
-            if table in tables:
-                show_sample_data(table)
+    # The summaries below come from tables that older databases don't have
+    # yet - create them if needed
+    init_db_if_needed()
+    
+    # One connection for the whole session, reused by every menu choice
+    with engine.connect() as conn:
+        while True:
+            print("\n📋 Menu:")
+            print("   1. Show all tables")
+            print("   2. Show price summary")
+            print("   3. Show inventory summary")
+            print("   4. Show table details")
+            print("   5. Show sample data")
+            print("   6. Run custom SQL query")
+            print("   q. Quit")
+            
+            choice = ask(conn, "\nChoice: ").lower()
+            
+            if choice == '1':
+                show_tables(conn)
+            
+            elif choice == '2':
+                show_price_summary(conn)
+            
+            elif choice == '3':
+                show_inventory_summary(conn)
+            
+            elif choice == '4':
+                tables = show_tables(conn)
+                table = ask(conn, "\nEnter table name: ")
+                if table in tables:
+                    # The quick row count is approximate - COUNT(*) is exact
+                    # but reads the whole table
+                    exact = ask(conn, "Count every row exactly? (slower on big tables) [y/N]: ").lower() == 'y'
+                    show_table_info(conn, table, exact=exact)
+                else:
+                    print(f"Table '{table}' not found")
+            
+            elif choice == '5':
+                tables = show_tables(conn)
+                table = ask(conn, "\nEnter table name: ")
+                if table in tables:
+                    show_sample_data(conn, table)
+                else:
+                    print(f"Table '{table}' not found")
+            
+            elif choice == '6':
+                print("\n💡 Example queries:")
+                print("   SELECT * FROM prices WHERE series_id = 'DCOILBRENTEU' ORDER BY date DESC LIMIT 10")
+                print("   SELECT region, MAX(value) FROM inventories GROUP BY region")
+                sql = ask(conn, "\nEnter SQL query: ")
+                if sql:
+                    run_custom_query(conn, sql)
+            
+            elif choice == 'q':
+                print("\n👋 Goodbye!")
+                break
+            
             else:
-                print(f"Table '{table}' not found")
-        
-        elif choice == '6':
-            print("\n💡 Example queries:")
-            print("   SELECT * FROM prices WHERE series_id = 'DCOILBRENTEU' ORDER BY date DESC LIMIT 10")
-            print("   SELECT region, MAX(value) FROM inventories GROUP BY region")
-            sql = input("\nEnter SQL query: ").strip()
-            if sql:
-                run_custom_query(sql)
-        
-        elif choice == 'q':
-            print("\n👋 Goodbye!")
-            break
-        
-        else:
-            print("Invalid choice, try again")
+                print("Invalid choice, try again")
 
 
 if __name__ == "__main__":
@@ -8,40 +8,107 @@ Output files are saved to the 'exports/' folder.
 """
 
 import os
-import sys
 import csv
+import itertools
 from datetime import datetime
 
-BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
-sys.path.insert(0, BACKEND_DIR)
+from _bootstrap import BACKEND_DIR
 
-from dotenv import load_dotenv
-# Load .env - check root first, then backend folder
-root_env = os.path.join(PROJECT_ROOT, ".env")
-backend_env = os.path.join(BACKEND_DIR, ".env")
-if os.path.exists(root_env):
-    load_dotenv(root_env, override=True)
-elif os.path.exists(backend_env):
-    load_dotenv(backend_env, override=True)
+from app.database import engine, run_query_iter
 
-from app.database import run_query
 
+# Pivot table columns: which rows go in which column
+PRICE_PIVOT_COLUMNS = {
+    'DCOILBRENTEU': 'Brent',
+    'DCOILWTICO': 'WTI',
+    'DDFUELUSGULF': 'ULSD_Gulf',
+    'DDFUELNYH': 'ULSD_NYH',
+}
+INVENTORY_PIVOT_COLUMNS = {
+    'US': 'US_Total',
+    'PADD1': 'PADD1',
+    'PADD2': 'PADD2',
+    'PADD3': 'PADD3',
+    'PADD4': 'PADD4',
+    'PADD5': 'PADD5',
+}
 
-def export_to_csv(data, filename, fieldnames):
-    """Export data to a CSV file"""
+
+def export_with_pivot(rows, filename, fieldnames, pivot_filename, pivot_key, pivot_columns):
+    """
+    Export rows to a CSV file, and build its pivot table (one row per date,
+    one column per series/region) from the same rows at the same time.
+    
+    `rows` must be sorted by date - e.g. streamed with run_query_iter(), so
+    the table is read once and never has to fit in memory. All the rows for
+    one date sit together, so each pivot row is written as soon as the date
+    changes.
+    
+    Rows are tuples with their values in `fieldnames` order (run_query_iter
+    with tuples=True), so they're written to the file as they are - no
+    looking up every column by name on every row.
+    
+    Args:
+        rows: Tuple-like rows in `fieldnames` order, sorted by date
+        filename / fieldnames: The flat export file and its columns
+        pivot_filename: The pivot table file
+        pivot_key: The column whose values become pivot columns ('series_id')
+        pivot_columns: Maps those values to pivot column names ('DCOILBRENTEU' -> 'Brent')
+    
+    Returns:
+        (filepath, rows written, pivot filepath, pivot rows written).
+        No files are created if there are no rows.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return None, 0, None, 0
+    
     # Create exports folder if it doesn't exist
     exports_dir = os.path.join(BACKEND_DIR, "exports")
     os.makedirs(exports_dir, exist_ok=True)
     
     filepath = os.path.join(exports_dir, filename)
+    pivot_filepath = os.path.join(exports_dir, pivot_filename)
     
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    with open(filepath, 'w', newline='', encoding='utf-8') as f, \
+         open(pivot_filepath, 'w', newline='', encoding='utf-8') as pivot_f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        # Pivot rows are plain lists: the date, then one slot per column
+        # (None is written as an empty cell, like a missing value)
+        pivot_writer = csv.writer(pivot_f)
+        pivot_writer.writerow(['date', *pivot_columns.values()])
+        positions = {key: i for i, key in enumerate(pivot_columns, start=1)}
+        empty = [None] * len(pivot_columns)
+        
+        # Where the date, pivot key and value sit in each row
+        date_i = fieldnames.index('date')
+        key_i = fieldnames.index(pivot_key)
+        value_i = fieldnames.index('value')
+        
+        count = 0
+        pivot_count = 0
+        pivot_row = [first[date_i], *empty]
+        
+        for row in itertools.chain([first], rows):
+            writer.writerow(row)
+            count += 1
+            
+            # New date - the previous date's pivot row is complete
+            if row[date_i] != pivot_row[0]:
+                pivot_writer.writerow(pivot_row)
+                pivot_count += 1
+                pivot_row = [row[date_i], *empty]
+            
+            position = positions.get(row[key_i])
+            if position:
+                pivot_row[position] = row[value_i]
+        
+        pivot_writer.writerow(pivot_row)
+        pivot_count += 1
     
-    return filepath
+    return filepath, count, pivot_filepath, pivot_count
 
 
 def main():
@@ -51,85 +118,52 @@ def main():
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Export prices
-    print("\n💰 Exporting prices...")
-    prices = run_query("""
-        SELECT source, series_id, date, value, unit, fetched_at
-        FROM prices
-        ORDER BY series_id, date
-    """)
-    
-    if prices:
-        filepath = export_to_csv(
+    # One connection for both exports
+    with engine.connect() as conn:
+        # Export prices, plus the pivot-style table for Excel - both from a
+        # single pass over the table, streamed into the files as it's read
+        print("\n💰 Exporting prices (and price pivot table)...")
+        prices = run_query_iter("""
+            SELECT source, series_id, date, value, unit, fetched_at
+            FROM prices
+            ORDER BY date, series_id
+        """, conn=conn, tuples=True)
+        
+        filepath, count, pivot_filepath, pivot_count = export_with_pivot(
             prices, 
             f"prices_{timestamp}.csv",
-            ['source', 'series_id', 'date', 'value', 'unit', 'fetched_at']
+            ['source', 'series_id', 'date', 'value', 'unit', 'fetched_at'],
+            f"prices_pivot_{timestamp}.csv",
+            'series_id',
+            PRICE_PIVOT_COLUMNS,
         )
-        print(f"   ✅ {len(prices)} records → {filepath}")
-    else:
-        print("   (no price data to export)")
-    
-    # Export inventories
-    print("\n📦 Exporting inventories...")
-    inventories = run_query("""
-        SELECT source, region, product, date, value, unit, fetched_at
-        FROM inventories
-        ORDER BY region, date
-    """)
-    
-    if inventories:
-        filepath = export_to_csv(
+        if count:
+            print(f"   ✅ {count} records → {filepath}")
+            print(f"   ✅ {pivot_count} rows → {pivot_filepath}")
+        else:
+            print("   (no price data to export)")
+        
+        # Export inventories (and the inventory pivot table)
+        print("\n📦 Exporting inventories (and inventory pivot table)...")
+        inventories = run_query_iter("""
+            SELECT source, region, product, date, value, unit, fetched_at
+            FROM inventories
+            ORDER BY date, region
+        """, conn=conn, tuples=True)
+        
+        filepath, count, pivot_filepath, pivot_count = export_with_pivot(
             inventories,
             f"inventories_{timestamp}.csv",
-            ['source', 'region', 'product', 'date', 'value', 'unit', 'fetched_at']
-        )
-        print(f"   ✅ {len(inventories)} records → {filepath}")
-    else:
-        print("   (no inventory data to export)")
-    
-    # Export price summary (pivot-style for Excel)
-    print("\n📊 Exporting price pivot table...")
-    pivot_prices = run_query("""
-        SELECT date,
-            MAX(CASE WHEN series_id = 'DCOILBRENTEU' THEN value END) as Brent,
-            MAX(CASE WHEN series_id = 'DCOILWTICO' THEN value END) as WTI,
-            MAX(CASE WHEN series_id = 'DDFUELUSGULF' THEN value END) as ULSD_Gulf,
-            MAX(CASE WHEN series_id = 'DDFUELNYH' THEN value END) as ULSD_NYH
-        FROM prices
-        GROUP BY date
-        ORDER BY date
-    """)
-    
-    if pivot_prices:
-        filepath = export_to_csv(
-            pivot_prices,
-            f"prices_pivot_{timestamp}.csv",
-            ['date', 'Brent', 'WTI', 'ULSD_Gulf', 'ULSD_NYH']
-        )
-        print(f"   ✅ {len(pivot_prices)} rows → {filepath}")
-    
-    # Export inventory pivot table
-    print("\n📊 Exporting inventory pivot table...")
-    pivot_inv = run_query("""
-        SELECT date,
-            MAX(CASE WHEN region = 'US' THEN value END) as US_Total,
-            MAX(CASE WHEN region = 'PADD1' THEN value END) as PADD1,
-            MAX(CASE WHEN region = 'PADD2' THEN value END) as PADD2,
-            MAX(CASE WHEN region = 'PADD3' THEN value END) as PADD3,
-            MAX(CASE WHEN region = 'PADD4' THEN value END) as PADD4,
-            MAX(CASE WHEN region = 'PADD5' THEN value END) as PADD5
-        FROM inventories
-        GROUP BY date
-        ORDER BY date
-    """)
-    
-    if pivot_inv:
-        filepath = export_to_csv(
-            pivot_inv,
+            ['source', 'region', 'product', 'date', 'value', 'unit', 'fetched_at'],
             f"inventories_pivot_{timestamp}.csv",
-            ['date', 'US_Total', 'PADD1', 'PADD2', 'PADD3', 'PADD4', 'PADD5']
+            'region',
+            INVENTORY_PIVOT_COLUMNS,
         )
-        print(f"   ✅ {len(pivot_inv)} rows → {filepath}")
+        if count:
+            print(f"   ✅ {count} records → {filepath}")
+            print(f"   ✅ {pivot_count} rows → {pivot_filepath}")
+        else:
+            print("   (no inventory data to export)")
     
     print("\n" + "=" * 60)
     print(f"📂 Files saved to: {os.path.join(BACKEND_DIR, 'exports')}")
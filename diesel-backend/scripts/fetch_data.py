@@ -12,7 +12,7 @@ Or edit the MONTHS variable below to set your default.
 """
 
 import asyncio
-import os
+import logging
 import sys
 
 # ============================================================
@@ -21,23 +21,25 @@ import sys
 MONTHS = 24  # How many months of history to fetch (default: 24 = 2 years)
 # ============================================================
 
-BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
-sys.path.insert(0, BACKEND_DIR)
-
-from dotenv import load_dotenv
-# Load .env - check root first, then backend folder
-root_env = os.path.join(PROJECT_ROOT, ".env")
-backend_env = os.path.join(BACKEND_DIR, ".env")
-if os.path.exists(root_env):
-    load_dotenv(root_env, override=True)
-elif os.path.exists(backend_env):
-    load_dotenv(backend_env, override=True)
+import _bootstrap  # loads .env
 
 from app.database import init_db, SessionLocal
+from app.fetchers import fred, eia
 from app.fetchers.fred import fetch_all_series
 from app.fetchers.eia import fetch_all_stocks
 
+# Show the fetchers' progress messages (they log instead of printing)
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+
+async def fetch_with_own_session(fetch_all, months: int):
+    """Run fetch_all_series / fetch_all_stocks on its own database session."""
+    db = SessionLocal()
+    try:
+        return await fetch_all(db, months=months)
+    finally:
+        db.close()
+
 
 async def main(months: int):
     print("=" * 60)
@@ -48,14 +50,19 @@ async def main(months: int):
     print("\n📦 Initializing database...")
     init_db()
     
-    db = SessionLocal()
-    
     try:
-        # Fetch FRED price data
-        print(f"\n💰 Fetching FRED prices ({months} months)...")
-        print("   Series: Brent, WTI, ULSD Gulf, ULSD NYH")
-        fred_results = await fetch_all_series(db, months=months)
+        # FRED and EIA are separate APIs, so fetch both at the same time
+        # (each with its own session - one session can't be shared between them)
+        print(f"\n📥 Fetching FRED prices and EIA inventories ({months} months)...")
+        print("   Series:  Brent, WTI, ULSD Gulf, ULSD NYH")
+        print("   Regions: US Total, PADD 1-5")
+        fred_results, eia_results = await asyncio.gather(
+            fetch_with_own_session(fetch_all_series, months),
+            fetch_with_own_session(fetch_all_stocks, months),
+        )
         
+        # FRED price data
+        print("\n💰 FRED prices:")
         fred_success = sum(1 for r in fred_results if r.get("success"))
         fred_records = sum(r.get("records_fetched", 0) for r in fred_results if r.get("success"))
         print(f"   ✅ {fred_success}/4 series fetched ({fred_records} total records)")
@@ -66,11 +73,8 @@ async def main(months: int):
             else:
                 print(f"      ❌ {r.get('series_id', 'Unknown')}: {r.get('error')}")
         
-        # Fetch EIA inventory data
-        print(f"\n📦 Fetching EIA inventories ({months} months)...")
-        print("   Regions: US Total, PADD 1-5")
-        eia_results = await fetch_all_stocks(db, months=months)
-        
+        # EIA inventory data
+        print("\n📦 EIA inventories:")
         eia_success = sum(1 for r in eia_results if r.get("success"))
         eia_records = sum(r.get("records_fetched", 0) for r in eia_results if r.get("success"))
         print(f"   ✅ {eia_success}/6 regions fetched ({eia_records} total records)")
@@ -92,7 +96,8 @@ async def main(months: int):
         print("💡 Run 'python scripts/export_csv.py' to export to CSV")
         
     finally:
-        db.close()
+        await fred.close_client()
+        await eia.close_client()
 
 
 if __name__ == "__main__":
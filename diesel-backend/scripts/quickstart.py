@@ -9,27 +9,19 @@ It will:
 """
 
 import asyncio
+import logging
 import os
-import sys
 
-# Add parent directory to path so we can import our modules
-BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
-sys.path.insert(0, BACKEND_DIR)
-
-from dotenv import load_dotenv
-# Load .env - check root first, then backend folder
-root_env = os.path.join(PROJECT_ROOT, ".env")
-backend_env = os.path.join(BACKEND_DIR, ".env")
-if os.path.exists(root_env):
-    load_dotenv(root_env, override=True)
-elif os.path.exists(backend_env):
-    load_dotenv(backend_env, override=True)
+import _bootstrap  # loads .env
 
 from app.database import init_db, get_db, run_query, SessionLocal
+from app.fetchers import fred, eia
 from app.fetchers.fred import fetch_all_series
 from app.fetchers.eia import fetch_all_stocks
 
+# Show the fetchers' progress messages (they log instead of printing)
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 
 async def main():
     """Main function to test the backend"""
@@ -90,39 +82,40 @@ async def main():
         print("\n📊 Database Summary:")
         print("-" * 40)
         
-        # Count prices
-        price_counts = run_query("""
-            SELECT series_id, COUNT(*) as count, MIN(date) as first, MAX(date) as last
-            FROM prices 
-            GROUP BY series_id
-        """)
+        # The counts come from the summary tables the fetchers just refreshed,
+        # on the session's connection (the one the fetches used)
+        conn = db.connection()
+        
+        # Count prices and inventories in one query: UNION ALL stacks both
+        # summaries, and `kind` says which table each row is about. Prices
+        # have no position, so they sort by name; regions sort US, PADD1-5,
+        # then any region missing from region_order (it gets the position
+        # after the last one - the same as the API does).
+        counts = run_query("""
+            SELECT 'price' as kind, series_id as name, NULL as position,
+                   records as count, first_date as first, date as last
+            FROM latest_prices
+            UNION ALL
+            SELECT 'inventory', region, COALESCE(position, (SELECT COUNT(*) FROM region_order)),
+                   records, first_date, date
+            FROM latest_inventories
+            LEFT JOIN region_order USING (region)
+            ORDER BY position, name
+        """, conn=conn)
+        price_counts = [row for row in counts if row['kind'] == 'price']
+        inv_counts = [row for row in counts if row['kind'] == 'inventory']
         
         if price_counts:
             print("\nPrices table:")
             for row in price_counts:
-                print(f"   {row['series_id']}: {row['count']} records ({row['first']} to {row['last']})")
+                print(f"   {row['name']}: {row['count']} records ({row['first']} to {row['last']})")
         else:
             print("\nPrices table: (empty)")
         
-        # Count inventories
-        inv_counts = run_query("""
-            SELECT region, COUNT(*) as count, MIN(date) as first, MAX(date) as last
-            FROM inventories 
-            GROUP BY region
-            ORDER BY CASE region
-                WHEN 'US' THEN 0
-                WHEN 'PADD1' THEN 1
-                WHEN 'PADD2' THEN 2
-                WHEN 'PADD3' THEN 3
-                WHEN 'PADD4' THEN 4
-                WHEN 'PADD5' THEN 5
-            END
-        """)
-        
         if inv_counts:
             print("\nInventories table:")
             for row in inv_counts:
-                print(f"   {row['region']}: {row['count']} records ({row['first']} to {row['last']})")
+                print(f"   {row['name']}: {row['count']} records ({row['first']} to {row['last']})")
         else:
             print("\nInventories table: (empty)")
         
@@ -139,6 +132,8 @@ async def main():
         
     finally:
         db.close()
+        await fred.close_client()
+        await eia.close_client()
 
 
 if __name__ == "__main__":